@@ -1,6 +1,8 @@
 from flask import Flask
 from config import Config
 from app.db import db
+from app.cache import init_cache
+from app.etl.jobs import init_jobs
 from flask_migrate import Migrate
 from flask_cors import CORS
 from app.routes import register_routes
@@ -18,11 +20,12 @@ def create_app(config_class=Config):
 
     # Load configuration
     app.config.from_object(config_class) # We using the config.py
-    app.config['MAX_CONTENT_LENGTH'] = 40 * 1024 * 1024  # 20MB
 
 
     # Initialize extensions
     db.init_app(app)
+    init_cache(app)
+    init_jobs(app)
     migrate = Migrate(app, db) # TODO: What is this? Not sure it's needed nor in use
 
     # Register blueprints (routes)
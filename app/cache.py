@@ -0,0 +1,123 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from flask import Response, request
+from flask_restx.utils import unpack
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "headers", "expires"])
+
+# Deleting a continent cascades to its countries, deleting a country to its regions,
+# and countries can embed their regions (?expand=regions)
+DEPENDENTS = {
+    "continent": ("pays", "region"),
+    "pays": ("region",),
+    "region": ("pays",),
+}
+
+class ResponseCache:
+    """Size-bounded LRU cache of serialized GET responses, keyed by namespace and URL.
+    Invalidation only reaches the process it runs in: entries also expire after ttl seconds,
+    so that other gunicorn workers stop serving a modified resource after at most ttl."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                self._size -= len(self._entries.pop(key).body)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, headers, generation):
+        """Store a response, unless its namespace was invalidated while it was being built"""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        entry = CacheEntry(body, hashlib.sha256(body).hexdigest()[:32], headers, expires)
+        with self._lock:
+            if generation != self.generation(key[0]) or len(body) > self.max_bytes:
+                return entry
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key).body)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, namespace):
+        """Drop every cached response of a namespace and of the namespaces depending on it"""
+        with self._lock:
+            for name in (namespace,) + DEPENDENTS.get(namespace, ()):
+                self._generations[name] = self.generation(name) + 1
+                for key in [key for key in self._entries if key[0] == name]:
+                    self._size -= len(self._entries.pop(key).body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+response_cache = ResponseCache()
+
+def init_cache(app):
+    """Configure the response cache with the Flask app."""
+    response_cache.max_bytes = app.config.get("RESPONSE_CACHE_MAX_BYTES", response_cache.max_bytes)
+    response_cache.ttl = app.config.get("RESPONSE_CACHE_TTL", response_cache.ttl)
+
+def cached(namespace):
+    """Cache the marshalled result of a GET resource method and answer If-None-Match with 304.
+    Must be the outermost decorator, above marshal_with/marshal_list_with."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (namespace, request.full_path)
+            entry = response_cache.get(key)
+            if entry is None:
+                generation = response_cache.generation(namespace)
+                result = func(*args, **kwargs)
+                data, code, headers = unpack(result)
+                if code != 200:
+                    return result
+                body = json.dumps(data).encode("utf-8")
+                entry = response_cache.set(key, body, dict(headers or {}), generation)
+
+            if request.if_none_match.contains(entry.etag):
+                response_cache.not_modified += 1
+                response = Response(status=304, headers=entry.headers)
+            else:
+                response = Response(entry.body, status=200, headers=entry.headers, mimetype="application/json")
+            response.set_etag(entry.etag)
+            return response
+        return wrapper
+    return decorator
@@ -1,18 +1,35 @@
+import os
+import threading
 from pymongo import MongoClient
 from config import Config
 
 _mongo_client = None
+_lock = threading.Lock()
+
+def _reset_after_fork():
+    """A MongoClient is not fork-safe: the child process builds its own on first use"""
+    global _mongo_client, _lock
+    _mongo_client = None
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
 
 def get_mongo_client():
     global _mongo_client
     if _mongo_client is None:
-        cfg = Config.MONGODB_CONFIG
-        _mongo_client = MongoClient(
-            host=cfg['host'],
-            port=int(cfg.get('port', 27017)),
-            username=cfg.get('username'),
-            password=cfg.get('password')
-        )
+        with _lock:
+            if _mongo_client is None:
+                cfg = Config.MONGODB_CONFIG
+                _mongo_client = MongoClient(
+                    host=cfg['host'],
+                    port=int(cfg.get('port', 27017)),
+                    username=cfg.get('username'),
+                    password=cfg.get('password'),
+                    maxPoolSize=cfg.get('max_pool_size', 100),
+                    connectTimeoutMS=cfg.get('connect_timeout_ms', 20000),
+                    serverSelectionTimeoutMS=cfg.get('server_selection_timeout_ms', 30000),
+                    socketTimeoutMS=cfg.get('socket_timeout_ms'),
+                )
     return _mongo_client
 
 def get_db():
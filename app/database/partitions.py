@@ -0,0 +1,124 @@
+import argparse
+import datetime
+import re
+from sqlalchemy import create_engine, text
+from config import Config
+
+# rapport is range-partitioned on date_debut (one partition per year or month, see RAPPORT_PARTITIONS).
+# Partitions are named rapport_YYYY or rapport_YYYY_MM; rows outside every range land in rapport_default
+# so inserts never fail, and are moved to their partition when it is created.
+TABLE = "rapport"
+DEFAULT_PARTITION = "rapport_default"
+INTERVALS = ("year", "month")
+BOUND_PATTERN = re.compile(r"FROM \('([0-9-]+)'\) TO \('([0-9-]+)'\)")
+
+def interval_start(day, interval):
+    """First day of the year or month containing day"""
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid partition interval '{interval}' ({', '.join(INTERVALS)})")
+    return day.replace(month=1, day=1) if interval == "year" else day.replace(day=1)
+
+def add_intervals(start, interval, count=1):
+    """First day of the year or month count intervals after start"""
+    if interval == "year":
+        return start.replace(year=start.year + count)
+    months = start.year * 12 + start.month - 1 + count
+    return start.replace(year=months // 12, month=months % 12 + 1)
+
+def partition_name(start, interval):
+    return f"{TABLE}_{start:%Y}" if interval == "year" else f"{TABLE}_{start:%Y_%m}"
+
+def list_partitions(connection):
+    """(name, start, end) of the range partitions of rapport, ordered by start (default partition excluded)"""
+    rows = connection.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": TABLE})
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound)
+        if match:
+            partitions.append((name, datetime.date.fromisoformat(match.group(1)), datetime.date.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def create_partition(connection, start, interval):
+    """Create the partition of one year or month, moving its rows out of the default partition"""
+    end = add_intervals(start, interval)
+    name = partition_name(start, interval)
+    bounds = {"start": start, "end": end}
+    in_range = "date_debut >= :start AND date_debut < :end"
+    # Bounds are dates built above, never user input
+    create = text(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{start}') TO ('{end}')")
+
+    moved = connection.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds).scalar()
+    if not moved:
+        connection.execute(create)
+        return name, 0
+    # A partition cannot be created while the default partition holds rows of its range
+    connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    connection.execute(create)
+    connection.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    connection.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return name, moved
+
+def ensure_partitions(connection, interval, ahead, first=None, today=None):
+    """Create the missing partitions from first (default: today) to ahead intervals after today.
+    Ranges overlapping an existing partition are skipped. Returns the names of the partitions created."""
+    today = today or datetime.date.today()
+    start = interval_start(min(first or today, today), interval)
+    last = add_intervals(interval_start(today, interval), interval, ahead)
+    existing = list_partitions(connection)
+
+    created = []
+    while start <= last:
+        end = add_intervals(start, interval)
+        if not any(start < existing_end and existing_start < end for _, existing_start, existing_end in existing):
+            name, moved = create_partition(connection, start, interval)
+            print(f"Partition {name} created ({moved} rows moved from {DEFAULT_PARTITION})")
+            created.append(name)
+        start = end
+    return created
+
+def detach_partitions(connection, before, drop=False):
+    """Detach the partitions whose whole range is before the given date, and drop them if asked.
+    concerne rows of dropped rapports are deleted. Those of detached rapports are kept for a later ATTACH:
+    until then they point to rapports that the API and the concerne trigger no longer see.
+    Returns the names of the partitions detached."""
+    detached = []
+    for name, _, end in list_partitions(connection):
+        if end > before:
+            continue
+        connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DELETE FROM concerne WHERE code_rapport IN (SELECT id FROM {name})"))
+            connection.execute(text(f"DROP TABLE {name}"))
+            print(f"Partition {name} dropped")
+        else:
+            kept = connection.execute(text(f"SELECT count(*) FROM concerne WHERE code_rapport IN (SELECT id FROM {name})")).scalar()
+            print(f"Partition {name} detached ({kept} concerne rows now point to its detached rapports)")
+        detached.append(name)
+    return detached
+
+def maintain(connection, settings=None, today=None):
+    """Create the future partitions and apply the retention of RAPPORT_PARTITIONS"""
+    settings = settings or Config.RAPPORT_PARTITIONS
+    today = today or datetime.date.today()
+    ensure_partitions(connection, settings['interval'], settings['ahead'], today=today)
+    if settings.get('retention'):
+        cutoff = add_intervals(interval_start(today, settings['interval']), settings['interval'], -settings['retention'])
+        detach_partitions(connection, cutoff, drop=settings.get('drop_detached', False))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the future partitions of rapport and detach the expired ones")
+    parser.add_argument("--detach-before", type=datetime.date.fromisoformat, help="Detach the partitions ending before this date (YYYY-MM-DD) instead of applying the retention")
+    parser.add_argument("--drop", action="store_true", help="Drop the detached partitions and delete their concerne rows (without it, those rows point to rapports hidden from the API)")
+    args = parser.parse_args()
+
+    settings = dict(Config.RAPPORT_PARTITIONS, drop_detached=args.drop or Config.RAPPORT_PARTITIONS['drop_detached'])
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    with engine.begin() as connection:
+        if args.detach_before:
+            detach_partitions(connection, args.detach_before, drop=settings['drop_detached'])
+        else:
+            maintain(connection, settings)
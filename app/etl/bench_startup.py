@@ -0,0 +1,46 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Measures the cold import time of the ETL registry and cleaners in fresh interpreters.
+# Network access is blocked in the child process: importing must neither download nor read data,
+# so the time stays the same whatever the size of the datasets.
+IMPORT_SNIPPET = """
+import socket, time
+def blocked(*args, **kwargs):
+    raise RuntimeError("network access during import")
+socket.socket.connect = blocked
+start = time.perf_counter()
+import {modules}
+print(time.perf_counter() - start)
+"""
+
+MODULES = [
+    "app.etl.registry",
+    "app.etl.components.transforme_clean_testingdata",
+    "app.etl.components.transforme_clean_vacdata",
+]
+
+def measure(modules, runs):
+    """Import time (seconds) of the modules, once per fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(modules=", ".join(modules))],
+            capture_output=True, text=True, check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the ETL modules")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    # Importing any app.* module first runs app/__init__.py (Flask app and routes)
+    baseline = measure(["app"], args.runs)
+    etl = measure(MODULES, args.runs)
+    print(f"app package  : median {statistics.median(baseline) * 1000:.1f} ms")
+    print(f"ETL modules  : median {statistics.median(etl) * 1000:.1f} ms "
+          f"(min {min(etl) * 1000:.1f}, max {max(etl) * 1000:.1f}, {args.runs} runs, network blocked)")
@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+
+# Noyau de nettoyage partagé par les nettoyeurs OWID (testing, vaccination).
+# Toutes les opérations sont vectorisées sur l'ensemble des colonnes numériques,
+# au lieu de boucler sur chaque pays et chaque colonne.
+
+def negatifs_to_nan(data: pd.DataFrame, columns):
+    """Convertit les colonnes en numérique et remplace les valeurs négatives par NaN.
+    Retourne le nombre de valeurs corrigées par colonne."""
+    corrections = {}
+    for col in columns:
+        data[col] = pd.to_numeric(data[col], errors='coerce')
+        negatifs = data[col] < 0
+        count = int(negatifs.sum())
+        if count > 0:
+            corrections[col] = count
+            data.loc[negatifs, col] = np.nan
+    return corrections
+
+def interpolate_by_group(data: pd.DataFrame, columns, group_col='country'):
+    """Interpolation linéaire des valeurs manquantes, groupe par groupe, en une seule passe groupby.
+    Résultat identique à `data.loc[mask, col].interpolate(method='linear')` appliqué pays par pays :
+    les NaN en tête de groupe restent NaN, ceux en fin de groupe prennent la dernière valeur connue."""
+    cols = [col for col in columns if data[col].isna().any()]
+    if not cols:
+        return data
+
+    values = data[cols].astype(float)
+    valid = values.notna()
+
+    # Position de chaque ligne dans son groupe (l'interpolation 'linear' ignore l'index)
+    groups = data[group_col]
+    position = groups.groupby(groups, sort=False).cumcount().astype(float)
+    valid_position = valid.mul(position, axis=0).where(valid)
+
+    # Dernière et prochaine valeur connue (et leur position) dans le groupe
+    known = pd.concat({'value': values, 'position': valid_position}, axis=1)
+    prev = known.groupby(groups, sort=False).ffill()
+    next_ = known.groupby(groups, sort=False).bfill()
+
+    # Même calcul que np.interp : pente * (x - x0) + y0
+    slope = (next_['value'] - prev['value']) / (next_['position'] - prev['position'])
+    interpolated = slope * prev['position'].rsub(position, axis=0) + prev['value']
+    interpolated = interpolated.where(next_['value'].notna(), prev['value'])
+
+    data[cols] = values.where(valid, interpolated)
+    return data
+
+def fill_missing(data: pd.DataFrame, keep_col='country'):
+    """Remplit les valeurs restantes : 0 pour les colonnes numériques, '' pour le texte (sauf `keep_col`)"""
+    numeriques = data.select_dtypes(include='number').columns
+    data[numeriques] = data[numeriques].fillna(0)
+
+    textes = [col for col in data.select_dtypes(include='object').columns if col != keep_col]
+    data[textes] = data[textes].fillna('')
+    return data
+
+def clean_by_group(data: pd.DataFrame, columns, group_col='country'):
+    """Négatifs -> NaN, interpolation par groupe puis remplissage des valeurs restantes.
+    Retourne le DataFrame nettoyé et les statistiques de correction."""
+    columns = [col for col in columns if col in data.columns]
+    corrections = negatifs_to_nan(data, columns)
+    data = interpolate_by_group(data, columns, group_col)
+    na_avant = int(data[columns].isna().sum().sum())
+    data = fill_missing(data, keep_col=group_col)
+    stats = {
+        'negatifs': corrections,
+        'na_avant_remplissage': na_avant,
+        'na_apres_remplissage': int(data[columns].isna().sum().sum()),
+    }
+    return data, stats
+
+def bornes_iqr(data: pd.DataFrame, columns):
+    """Bornes des valeurs aberrantes par colonne : [max(0, Q1 - 1.5 IQR), Q3 + 1.5 IQR]"""
+    return {col: iqr_limites(data[col].quantile(0.25), data[col].quantile(0.75)) for col in columns}
+
+def iqr_limites(q1, q3):
+    iqr = q3 - q1
+    return max(0, q1 - 1.5 * iqr), q3 + 1.5 * iqr
+
+def corriger_aberrantes(data: pd.DataFrame, bornes):
+    """Ramène les valeurs hors bornes sur les bornes.
+    Retourne le nombre de valeurs corrigées par colonne."""
+    corrections = {}
+    for col, (limite_inf, limite_sup) in bornes.items():
+        count = int(((data[col] > limite_sup) | (data[col] < limite_inf)).sum())
+        if count > 0:
+            corrections[col] = count
+            data.loc[data[col] > limite_sup, col] = limite_sup
+            data.loc[data[col] < limite_inf, col] = limite_inf
+    return corrections
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import pandas as pd
+from .clean_common import corriger_aberrantes, iqr_limites
+from .processedData import read_processed, write_processed
+
+# Nettoyage hors mémoire des fichiers OWID : le fichier source est découpé par pays sur disque
+# en une seule lecture, chaque pays est nettoyé séparément (l'interpolation ne dépend que du pays),
+# puis les bornes IQR sont calculées sur les colonnes nettoyées de tous les pays (seconde lecture)
+# avant la correction des valeurs aberrantes et l'envoi vers la destination, pays par pays.
+
+DEFAULT_MEMORY_LIMIT = 512 * 1024 * 1024  # 512 Mo
+MEMORY_FACTOR = 4  # copies faites par pandas pendant le traitement d'un bloc
+SAMPLE_ROWS = 1000
+PARTITION_FORMAT = "parquet"
+
+def estimer_chunksize(source, memory_limit):
+    """Nombre de lignes lues par bloc pour rester sous la limite mémoire"""
+    sample = pd.read_csv(source, nrows=SAMPLE_ROWS)
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    return max(SAMPLE_ROWS, int(memory_limit / (bytes_per_row * MEMORY_FACTOR)))
+
+def partitionner(source, directory, chunksize, group_col='country'):
+    """Découpe le fichier source par valeur de `group_col` en fichiers CSV, en une seule lecture.
+    Retourne les partitions ({valeur: chemin}), les colonnes vides et les colonnes numériques du fichier entier."""
+    partitions = {}
+    non_nuls = None
+    numeriques = None
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        counts = chunk.notna().sum()
+        non_nuls = counts if non_nuls is None else non_nuls.add(counts, fill_value=0)
+        chunk_numeriques = {col for col in chunk.columns if pd.api.types.is_numeric_dtype(chunk[col])}
+        numeriques = chunk_numeriques if numeriques is None else numeriques & chunk_numeriques
+
+        for key, part in chunk.groupby(group_col, sort=False, dropna=False):
+            path = partitions.get(key)
+            if path is None:
+                path = partitions[key] = os.path.join(directory, f"part-{len(partitions):05d}.csv")
+                part.to_csv(path, index=False)
+            else:
+                part.to_csv(path, mode='a', header=False, index=False)
+
+    vides = [col for col, count in non_nuls.items() if count == 0] if non_nuls is not None else []
+    colonnes = list(non_nuls.index) if non_nuls is not None else []
+    return partitions, colonnes, vides, numeriques or set()
+
+def ordre_partitions(partitions):
+    """Partitions dans l'ordre du tri par pays (valeurs manquantes en dernier)"""
+    keys = sorted(key for key in partitions if not pd.isna(key))
+    return [(key, partitions[key]) for key in keys] + [(key, path) for key, path in partitions.items() if pd.isna(key)]
+
+def lire_partition(path, colonnes, vides, numeriques):
+    """Relit une partition avec les types du fichier entier (une colonne vide pour un pays reste du texte si elle l'est ailleurs)"""
+    usecols = [col for col in colonnes if col not in vides]
+    dtype = {col: object for col in usecols if col not in numeriques}
+    return pd.read_csv(path, usecols=usecols, dtype=dtype)
+
+def bornes_globales(paths, columns, nb_lignes, memory_limit):
+    """Bornes IQR calculées sur toutes les partitions nettoyées.
+    Les colonnes sont lues par lots, autant que la limite mémoire le permet."""
+    par_lot = max(1, int(memory_limit / (max(nb_lignes, 1) * 8 * MEMORY_FACTOR)))
+    if par_lot == 1 and nb_lignes * 8 * MEMORY_FACTOR > memory_limit:
+        print(f"Attention: une colonne de {nb_lignes} lignes dépasse la limite mémoire")
+
+    bornes = {}
+    for i in range(0, len(columns), par_lot):
+        lot = columns[i:i + par_lot]
+        values = pd.concat([read_processed(path, PARTITION_FORMAT, columns=lot) for path in paths], ignore_index=True)
+        for col in lot:
+            if col in values.columns:
+                bornes[col] = iqr_limites(values[col].quantile(0.25), values[col].quantile(0.75))
+    return bornes
+
+def clean_out_of_core(source, sink, preparer, finaliser, drop_empty=False,
+                      memory_limit=DEFAULT_MEMORY_LIMIT, workdir=None, group_col='country'):
+    """Nettoie un fichier OWID plus gros que la mémoire et envoie le résultat à `sink`, pays par pays.
+    `preparer` et `finaliser` sont les étapes du nettoyeur (avant et après les valeurs aberrantes).
+    Retourne le nombre de lignes envoyées."""
+    directory = tempfile.mkdtemp(prefix="etl-partitions-", dir=workdir)
+    try:
+        chunksize = estimer_chunksize(source, memory_limit)
+        print(f"Découpage par pays de {source} (blocs de {chunksize} lignes)...")
+        partitions, colonnes, vides, numeriques = partitionner(source, directory, chunksize, group_col)
+        print(f"{len(partitions)} partitions écrites dans {directory}")
+
+        # Les colonnes vides sur l'ensemble du fichier sont supprimées avant le nettoyage
+        vides = vides if drop_empty else []
+
+        print("Nettoyage des partitions...")
+        nettoyees = []
+        colonnes_numeriques = []
+        nb_lignes = 0
+        for i, (key, path) in enumerate(ordre_partitions(partitions)):
+            data = lire_partition(path, colonnes, vides, numeriques)
+            if data.memory_usage(deep=True).sum() * MEMORY_FACTOR > memory_limit:
+                print(f"Attention: la partition '{key}' dépasse la limite mémoire")
+            data, columns = preparer(data, drop_empty=False, verbose=False)
+            colonnes_numeriques += [col for col in columns if col not in colonnes_numeriques]
+            nb_lignes += len(data)
+
+            cleaned_path = os.path.join(directory, f"clean-{i:05d}.{PARTITION_FORMAT}")
+            write_processed(data, cleaned_path, PARTITION_FORMAT)
+            nettoyees.append(cleaned_path)
+            os.remove(path)
+
+        print("Traitement des valeurs aberrantes...")
+        bornes = bornes_globales(nettoyees, colonnes_numeriques, nb_lignes, memory_limit)
+
+        corrections = {}
+        for path in nettoyees:
+            data = read_processed(path, PARTITION_FORMAT)
+            for col, count in corriger_aberrantes(data, bornes).items():
+                corrections[col] = corrections.get(col, 0) + count
+            sink(finaliser(data, verbose=False))
+        for col, count in corrections.items():
+            print(f"Correction de {count} valeurs aberrantes dans '{col}'")
+
+        print(f"Nettoyage hors mémoire terminé : {nb_lignes} lignes, {len(nettoyees)} pays.")
+        return nb_lignes
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def csv_sink(path):
+    """Destination qui ajoute chaque partition nettoyée à un fichier CSV"""
+    if os.path.exists(path):
+        os.remove(path)
+
+    def sink(data: pd.DataFrame):
+        data.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    return sink
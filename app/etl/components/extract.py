@@ -0,0 +1,29 @@
+import os
+import tempfile
+import time
+import requests
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+def download_csv(url, chunk_size=DOWNLOAD_CHUNK_SIZE, timeout=60):
+    """Stream a remote CSV file to a temporary file and return its path.
+    gzip transfer encoding is decoded on the fly; .gz files keep their extension
+    so that pd.read_csv can infer the compression. The caller removes the file."""
+    suffix = '.csv.gz' if url.split('?')[0].endswith('.gz') else '.csv'
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix='etl-download-')
+    start = time.perf_counter()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as file, requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+
+    elapsed = time.perf_counter() - start
+    rate = size / elapsed if elapsed > 0 else float('inf')
+    print(f"Downloaded {size} bytes from {url} in {elapsed:.2f}s ({rate / 1024 / 1024:.2f} MB/s).")
+    return path
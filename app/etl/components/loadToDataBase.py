@@ -1,93 +1,113 @@
 import sys
 import os
 import pandas as pd
-from sqlalchemy.orm import Session
-from db import engine, SessionLocal
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from sqlalchemy import delete, insert
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+from app import create_app
+from app.db import db
 from app.models import Rapport, Pays, Maladie, Periode
-import os
 from configETL import CONFIG, PROCESSED_DATA_PATH
-
-
-
-def get_code_maladie(nom_maladie):
-    """Récupère le code de la maladie dans PostgreSQL"""
-    session = SessionLocal()
-    code = session.query(Maladie.code_maladie).filter(Maladie.nom == nom_maladie).scalar()
-    session.close()
-    return code
-
-def get_code_periode(date):
-    """Récupère le code période correspondant à l'année de la date"""
-    session = SessionLocal()
-    code = session.query(Periode.code_periode).filter(Periode.nom == str(date.year)).scalar()
-    session.close()
-    return code
-
-def get_code_pays(code_pays):
-    """Vérifie si le pays existe dans la base"""
-    session = SessionLocal()
-    exists = session.query(Pays.code_pays).filter(Pays.code_pays == code_pays).scalar()
-    session.close()
-    return exists is not None
-
-def load_data(file_key):
-    """Charge les données d'un fichier CSV spécifique dans PostgreSQL"""
-    if file_key not in CONFIG["files"]:
-        print(f"⚠️ Aucune configuration trouvée pour '{file_key}'")
-        return
-
-    config = CONFIG["files"][file_key]
-    file_path = os.path.join(PROCESSED_DATA_PATH, config["input_file"])
+from .processedData import DEFAULT_FORMAT, processed_path, read_processed
+
+
+
+RAPPORT_COLUMNS = [
+    "nouveaux_cas", "nouveaux_deces", "nouveaux_gueris",
+    "cas_actifs", "taux_mortalite", "taux_guerison",
+]
+BATCH_SIZE = 10000
+SOURCE = "OMS"
+
+
+def load_reference_keys(session, nom_maladie):
+    """Charge en une fois les clés de référence (maladie, périodes, pays)"""
+    code_maladie = session.query(Maladie.id).filter(Maladie.nom == nom_maladie).scalar()
+    periodes = dict(session.query(Periode.nom, Periode.id).all())
+    pays = {code for (code,) in session.query(Pays.code_pays).all()}
+    return code_maladie, periodes, pays
+
+def resolve_keys(df, code_maladie, periodes, pays):
+    """Associe les clés étrangères de façon vectorisée.
+    Retourne (lignes valides, lignes rejetées)"""
+    df = df.copy()
+    df["date_debut"] = pd.to_datetime(df["date_debut"], errors="coerce")
+    annees = df["date_debut"].dt.year.astype("Int64").astype("string")
+    df["code_periode"] = annees.map(periodes)
+    df["code_maladie"] = code_maladie
+
+    valides = df["code_periode"].notna() & df["code_pays"].isin(pays)
+    return df[valides], df[~valides]
+
+def build_rapports(df):
+    """Construit les enregistrements Rapport à partir des lignes valides"""
+    rapports = pd.DataFrame({
+        "date_debut": df["date_debut"].dt.date,
+        "date_fin": df["date_debut"].dt.date,  # Supposition, peut être modifié
+        "source": SOURCE,
+        "code_maladie": df["code_maladie"],
+        "code_periode": df["code_periode"].astype(int),
+    })
+    for col in RAPPORT_COLUMNS:
+        if col in df.columns:
+            # Colonnes entières côté modèle
+            rapports[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+
+    rapports = rapports.astype(object).where(rapports.notna(), None)
+    return rapports.to_dict("records")
+
+def delete_rapports(session, code_maladie, since=None):
+    """Supprime les rapports déjà chargés pour la maladie après `since` (tous si None),
+    pour qu'un rechargement remplace les lignes au lieu de les dupliquer.
+    Les lignes de concerne associées sont supprimées par le trigger de rapport."""
+    query = delete(Rapport).where(Rapport.code_maladie == code_maladie, Rapport.source == SOURCE)
+    if since is not None:
+        query = query.where(Rapport.date_debut > pd.Timestamp(since).date())
+    return session.execute(query).rowcount
+
+def load_data(file_key, app=None, since=None):
+    """Charge les données traitées d'un dataset dans PostgreSQL, avec la session de l'application Flask.
+    Les rapports de la maladie postérieurs à `since` (tous si None) sont remplacés.
+    Lève une exception si rien n'a pu être chargé (configuration, fichier ou maladie manquants, erreur SQL).
+    Retourne le DataFrame des lignes rejetées (clés étrangères inconnues)."""
+    if file_key not in CONFIG["datasets"]:
+        raise ValueError(f"Aucune configuration trouvée pour '{file_key}'")
+
+    config = CONFIG["datasets"][file_key]
+    fmt = config.get("output_format", DEFAULT_FORMAT)
+    file_path = processed_path(PROCESSED_DATA_PATH, config["output_file"], fmt)
 
     if not os.path.exists(file_path):
-        print(f"❌ Fichier non trouvé : {file_path}")
-        return
+        raise FileNotFoundError(f"Fichier non trouvé : {file_path}")
 
     print(f"📥 Chargement des données depuis {file_path}...")
-    df = pd.read_csv(file_path)
+    # Seules les colonnes utiles au chargement sont lues
+    df = read_processed(file_path, fmt, columns=["date_debut", "code_pays"] + RAPPORT_COLUMNS)
 
-    # Récupérer la maladie associée
     nom_maladie = config["maladie"]
-    code_maladie = get_code_maladie(nom_maladie)
-
-    if not code_maladie:
-        print(f"❌ Maladie inconnue dans la base : {nom_maladie}")
-        return
-
-    session = SessionLocal()
-
-    try:
-        for _, row in df.iterrows():
-            # Vérification des clés étrangères
-            code_periode = get_code_periode(row["date_debut"])
-            
-            if not code_periode or not get_code_pays(row["code_pays"]):
-                print(f"⚠️ Données ignorées : {row}")
-                continue
-
-            rapport = Rapport(
-                date_debut=row["date_debut"],
-                date_fin=row["date_debut"],  # Supposition, peut être modifié
-                source="OMS",
-                nouveaux_cas=row["nouveaux_cas"],
-                nouveaux_deces=row["nouveaux_deces"],
-                nouveaux_gueris=row["nouveaux_gueris"],
-                cas_actifs=row["cas_actifs"],
-                taux_mortalite=row["taux_mortalite"],
-                taux_guerison=row["taux_guerison"],
-                code_maladie=code_maladie,
-                code_periode=code_periode
-            )
-
-            session.add(rapport)
-
-        session.commit()
-        print(f"✅ Données de {nom_maladie} insérées dans PostgreSQL")
-
-    except Exception as e:
-        session.rollback()
-        print(f"❌ Erreur lors de l'insertion des données {nom_maladie} : {e}")
-
-    finally:
-        session.close()
+    with (app or create_app()).app_context():
+        session = db.session
+        try:
+            # Récupérer les clés de référence une seule fois pour tout le fichier
+            code_maladie, periodes, pays = load_reference_keys(session, nom_maladie)
+            if not code_maladie:
+                raise ValueError(f"Maladie inconnue dans la base : {nom_maladie}")
+
+            valides, rejetees = resolve_keys(df, code_maladie, periodes, pays)
+            rapports = build_rapports(valides)
+
+            # Remplacement dans la même transaction que l'insertion
+            supprimes = delete_rapports(session, code_maladie, since)
+            # Insertion par lots (executemany multi-valeurs), validée en une seule transaction
+            for start in range(0, len(rapports), BATCH_SIZE):
+                session.execute(insert(Rapport), rapports[start:start + BATCH_SIZE])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    if supprimes:
+        print(f"🗑️ {supprimes} rapports de {nom_maladie} déjà chargés remplacés")
+    print(f"✅ {len(rapports)} rapports de {nom_maladie} insérés dans PostgreSQL")
+    if not rejetees.empty:
+        print(f"⚠️ {len(rejetees)} lignes ignorées (période ou pays inconnu)")
+    return rejetees
@@ -1,7 +1,16 @@
-from pymongo import MongoClient, errors
+from pymongo import MongoClient, errors, ASCENDING, IndexModel
 from bson import json_util, ObjectId
 from app.database.mongoClient import get_db
+from config import Config
 from datetime import datetime
+import base64
+import binascii
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Sort key used for keyset pagination; _id makes the order total
+KEYSET_FIELDS = ('date', 'country', '_id')
 
 def insert_data(data, collection_name):
     try:
@@ -9,10 +18,115 @@ def insert_data(data, collection_name):
         collection = db[collection_name]
         collection.insert_many(data.to_dict('records'))
         print(f"Data inserted into MongoDB collection '{collection_name}' successfully.")
+        ensure_indexes(collection_name)
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        raise
+
+def insert_chunks(chunks, collection_name, progress=None):
+    """Insert an iterable of DataFrames one chunk at a time, returns the number of documents inserted.
+    progress, if given, is called with the running total after each chunk."""
+    try:
+        db = get_db()
+        collection = db[collection_name]
+        total = 0
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            collection.insert_many(chunk.to_dict('records'))
+            total += len(chunk)
+            if progress:
+                progress(total)
+        print(f"{total} documents inserted into MongoDB collection '{collection_name}' successfully.")
+        if total:
+            ensure_indexes(collection_name)
+        return total
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
         raise
 
+def get_index_specs(collection_name):
+    """Declared index keys of a collection (falls back to the default declaration)"""
+    indexes = Config.MONGODB_INDEXES
+    return indexes.get(collection_name, indexes.get('default', []))
+
+def ensure_indexes(collection_name, background=True):
+    """Create the declared indexes of a collection, in a background thread by default"""
+    specs = get_index_specs(collection_name)
+    if not specs:
+        return None
+
+    def build():
+        try:
+            db = get_db()
+            names = db[collection_name].create_indexes([IndexModel(keys) for keys in specs])
+            print(f"Indexes {names} ensured on MongoDB collection '{collection_name}'.")
+        except errors.PyMongoError as e:
+            print(f"Error creating indexes on '{collection_name}': {e}")
+
+    if not background:
+        build()
+        return None
+    thread = threading.Thread(target=build, name=f"mongo-indexes-{collection_name}", daemon=True)
+    thread.start()
+    return thread
+
+def get_index_stats(collection_name):
+    """Index keys, sizes and usage counters ($indexStats) of a collection"""
+    collection = get_db()[collection_name]
+    sizes = get_storage_stats(collection_name).get('indexSizes', {})
+    usage = {stat['name']: stat for stat in collection.aggregate([{'$indexStats': {}}])}
+
+    indexes = []
+    for name, info in collection.index_information().items():
+        accesses = usage.get(name, {}).get('accesses', {})
+        since = accesses.get('since')
+        indexes.append({
+            'name': name,
+            'key': [[field, direction] for field, direction in info['key']],
+            'size': sizes.get(name),
+            'ops': accesses.get('ops'),
+            'since': since.isoformat() if isinstance(since, datetime) else None,
+        })
+    return indexes
+
+def _clean_document(doc):
+    """Make a raw Mongo document JSON friendly"""
+    # Convert ObjectId to string
+    doc['_id'] = str(doc['_id'])
+
+    # Convert datetime to ISO string
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            doc[key] = value.isoformat()
+
+    return doc
+
+def encode_cursor(doc):
+    """Build an opaque cursor pointing right after the given raw document"""
+    payload = json_util.dumps([doc.get(field) for field in KEYSET_FIELDS])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor built by encode_cursor, raises ValueError if malformed"""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(KEYSET_FIELDS):
+        raise ValueError("Invalid cursor")
+    return values
+
+def keyset_filter(values):
+    """Range predicate selecting documents strictly after the (date, country, _id) tuple.
+    Null and missing keys sort first: {'$gt': None} matches nothing, so "after null" is "not null"."""
+    clauses = []
+    for i, field in enumerate(KEYSET_FIELDS):
+        clause = {KEYSET_FIELDS[j]: values[j] for j in range(i)}
+        clause[field] = {'$ne': None} if values[i] is None else {'$gt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
 def fetch_data(collection_name, query=None, skip=0, limit=1000):
     try:
         db = get_db()
@@ -22,17 +136,7 @@ def fetch_data(collection_name, query=None, skip=0, limit=1000):
         cursor = collection.find(query or {}).skip(skip).limit(limit)
 
         # Convert each document to clean JSON
-        data = []
-        for doc in cursor:
-            # Convert ObjectId to string
-            doc['_id'] = str(doc['_id'])
-            
-            # Convert datetime to ISO string
-            for key, value in doc.items():
-                if isinstance(value, datetime):
-                    doc[key] = value.isoformat()
-
-            data.append(doc)
+        data = [_clean_document(doc) for doc in cursor]
 
         # Serialize the data to standard JSON
         json_data = json_util.dumps(data)
@@ -43,6 +147,84 @@ def fetch_data(collection_name, query=None, skip=0, limit=1000):
         print(f"Error fetching data from MongoDB: {e}")
         return json_util.dumps({"error": str(e)})
 
+def keyset_query(query=None, cursor=None):
+    """Filters of the page following `cursor`, raises ValueError if the cursor is malformed"""
+    filters = dict(query or {})
+    if cursor:
+        filters = {'$and': [filters, keyset_filter(decode_cursor(cursor))]}
+    return filters
+
+def fetch_data_after(collection_name, query=None, cursor=None, limit=1000):
+    """Keyset pagination: fetch the page following `cursor`, returns (json_data, next_cursor).
+    Raises ValueError for a malformed cursor and PyMongoError if the query fails."""
+    try:
+        db = get_db()
+        collection = db[collection_name]
+        filters = keyset_query(query, cursor)
+
+        # Fetch one extra document to know whether another page exists
+        sort = [(field, ASCENDING) for field in KEYSET_FIELDS]
+        docs = list(collection.find(filters).sort(sort).limit(limit + 1))
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1])
+
+        data = [_clean_document(doc) for doc in docs]
+        return json_util.dumps(data), next_cursor
+
+    except errors.PyMongoError as e:
+        print(f"Error fetching data from MongoDB: {e}")
+        raise
+
+def _encode_documents(cursor, ndjson=True, batch_size=500):
+    """Encode documents straight from a Mongo cursor, yielding one text chunk per batch"""
+    try:
+        if not ndjson:
+            yield '['
+        chunk = []
+        first = True
+        for doc in cursor:
+            encoded = json_util.dumps(_clean_document(doc))
+            if ndjson:
+                chunk.append(encoded + '\n')
+            else:
+                chunk.append(encoded if first else ',' + encoded)
+                first = False
+            if len(chunk) >= batch_size:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+        if not ndjson:
+            yield ']'
+    finally:
+        cursor.close()
+
+def stream_data(collection_name, query=None, skip=0, limit=1000, ndjson=True, batch_size=500):
+    """Encode documents straight from the Mongo cursor, yielding one text chunk per batch"""
+    db = get_db()
+    cursor = db[collection_name].find(query or {}).skip(skip).limit(limit).batch_size(batch_size)
+    yield from _encode_documents(cursor, ndjson, batch_size)
+
+def stream_data_after(collection_name, query=None, cursor=None, limit=1000, ndjson=True, batch_size=500):
+    """Keyset pagination, streamed: returns (chunks, next_cursor).
+    next_cursor is read first from the keys of the page (covered by the keyset index), so that it can be
+    sent before the documents; ValueError and PyMongoError are raised here, before anything is streamed."""
+    try:
+        collection = get_db()[collection_name]
+        filters = keyset_query(query, cursor)
+        sort = [(field, ASCENDING) for field in KEYSET_FIELDS]
+        keys = list(collection.find(filters, {field: 1 for field in KEYSET_FIELDS})
+                    .sort(sort).skip(limit - 1).limit(2))
+        next_cursor = encode_cursor(keys[0]) if len(keys) > 1 else None
+        documents = collection.find(filters).sort(sort).limit(limit).batch_size(batch_size)
+    except errors.PyMongoError as e:
+        print(f"Error fetching data from MongoDB: {e}")
+        raise
+    return _encode_documents(documents, ndjson, batch_size), next_cursor
+
 def get_collection_names():
     try:
         db = get_db()
@@ -51,14 +233,60 @@ def get_collection_names():
         print(f"Error fetching collection names: {e}")
         return []
     
-def get_collection_infos():
+_collection_infos_cache = {'expires': 0, 'data': None}
+_collection_infos_lock = threading.Lock()
+
+def get_storage_stats(collection_name):
+    """storageStats section of $collStats (cheap, no collection scan)"""
+    db = get_db()
+    result = db[collection_name].aggregate([{'$collStats': {'storageStats': {}}}])
+    return next(result, {}).get('storageStats', {})
+
+def get_collection_info(collection_name, exact=False):
+    db = get_db()
+    stats = get_storage_stats(collection_name)
+    if exact:
+        count = db[collection_name].count_documents({})
+    else:
+        count = stats.get('count')
+        if count is None:
+            count = db[collection_name].estimated_document_count()
+    return {
+        'collection': collection_name,
+        'count': count,
+        'exact': exact,
+        'storage_size': stats.get('storageSize'),
+        'avg_doc_size': stats.get('avgObjSize'),
+        'index_size': stats.get('totalIndexSize'),
+    }
+
+def _collection_info_or_error(collection_name, exact=False):
+    """get_collection_info, or the error of that collection so that the others are still returned"""
+    try:
+        return get_collection_info(collection_name, exact)
+    except errors.PyMongoError as e:
+        print(f"Error fetching info of collection '{collection_name}': {e}")
+        return {'collection': collection_name, 'error': str(e)}
+
+def get_collection_infos(exact=False):
+    """Statistics of every collection, fetched concurrently.
+    A collection whose statistics fail is listed with its error; PyMongoError is raised if the collections cannot be listed.
+    Estimated counts are cached for COLLECTION_STATS_TTL seconds (unless one failed); exact=True always recounts."""
+    if not exact:
+        with _collection_infos_lock:
+            if _collection_infos_cache['data'] is not None and time.monotonic() < _collection_infos_cache['expires']:
+                return _collection_infos_cache['data']
     try:
         db = get_db()
-        collections = []
-        for collection in db.list_collection_names():
-            count = db[collection].count_documents({})
-            collections.append({'collection': collection, 'count': count})
-        return collections
+        names = db.list_collection_names()
     except errors.PyMongoError as e:
         print(f"Error fetching collection info: {e}")
-        return []
+        raise
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(names)))) as executor:
+        collections = list(executor.map(lambda name: _collection_info_or_error(name, exact), names))
+
+    if not exact and not any('error' in collection for collection in collections):
+        with _collection_infos_lock:
+            _collection_infos_cache['data'] = collections
+            _collection_infos_cache['expires'] = time.monotonic() + Config.COLLECTION_STATS_TTL
+    return collections
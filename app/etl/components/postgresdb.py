@@ -1,4 +1,10 @@
 from psycopg2 import connect, sql
+import io
+import time
+
+DEFAULT_LOADER = 'copy'
+DEFAULT_CHUNK_SIZE = 50000
+NULL_MARKER = '\\N'
 
 def get_connection(config):
     return connect(
@@ -28,34 +34,79 @@ def create_table(conn, table_name, columns):
         print(f"Error creating table in PostgreSQL: {e}")
         raise
 
-def insert_data(config, data, table_name):
+def copy_chunks(conn, data, table_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream the DataFrame through COPY ... FROM STDIN, one transaction per chunk"""
+    # Missing values are written as \N so that empty strings stay empty strings, as with INSERT
+    query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+        sql.Identifier(table_name),
+        sql.SQL(', ').join(map(sql.Identifier, data.columns)),
+        sql.Literal(NULL_MARKER)
+    )
+    cursor = conn.cursor()
+    rows = 0
+    try:
+        for start in range(0, len(data), chunk_size):
+            chunk = data.iloc[start:start + chunk_size]
+
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, index=False, header=False, na_rep=NULL_MARKER)
+            buffer.seek(0)
+
+            cursor.copy_expert(query, buffer)
+            conn.commit()
+            rows += len(chunk)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return rows
+
+def insert_rows(conn, data, table_name):
+    """Row by row INSERT, kept for small frames and debugging"""
+    cursor = conn.cursor()
+    
+    # Generate the SQL query for inserting data
+    columns = data.columns
+    query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
+        sql.Identifier(table_name),
+        sql.SQL(', ').join(map(sql.Identifier, columns)),
+        sql.SQL(', ').join(sql.Placeholder() * len(columns))
+    )
+    
+    # Execute the query for each row of data
+    for row in data.itertuples(index=False, name=None):
+        cursor.execute(query, row)
+    
+    conn.commit()
+    cursor.close()
+    return len(data)
+
+def insert_data(config, data, table_name, loader=None, chunk_size=None):
+    loader = loader or config.get('loader', DEFAULT_LOADER)
+    chunk_size = chunk_size or config.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    conn = None
     try:
         conn = get_connection(config)
         
         # Create table before inserting data
         create_table(conn, table_name, data.columns)
         
-        cursor = conn.cursor()
-        
-        # Generate the SQL query for inserting data
-        columns = data.columns
-        query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-            sql.Identifier(table_name),
-            sql.SQL(', ').join(map(sql.Identifier, columns)),
-            sql.SQL(', ').join(sql.Placeholder() * len(columns))
-        )
-        
-        # Execute the query for each row of data
-        for row in data.itertuples(index=False, name=None):
-            cursor.execute(query, row)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        print(f"Data inserted into table '{table_name}' successfully.")
+        start = time.perf_counter()
+        if loader == 'copy':
+            rows = copy_chunks(conn, data, table_name, chunk_size)
+        else:
+            rows = insert_rows(conn, data, table_name)
+        elapsed = time.perf_counter() - start
+
+        rate = rows / elapsed if elapsed > 0 else float('inf')
+        print(f"Data inserted into table '{table_name}' successfully ({rows} rows, {rate:.0f} rows/sec, {loader}).")
     except Exception as e:
         print(f"Error connecting to PostgreSQL: {e}")
         raise
+    finally:
+        if conn is not None:
+            conn.close()
 
 # etl/transform.py
 def transform_data(data):
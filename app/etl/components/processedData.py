@@ -0,0 +1,50 @@
+import os
+import pandas as pd
+
+# Formats disponibles pour les fichiers intermédiaires (PROCESSED_DATA_PATH)
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+DEFAULT_FORMAT = "csv"
+
+def processed_path(directory, file_name, fmt=DEFAULT_FORMAT):
+    """Chemin du fichier traité, avec l'extension du format choisi"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format '{fmt}' non supporté ({', '.join(FORMATS)})")
+    return os.path.join(directory, os.path.splitext(file_name)[0] + FORMATS[fmt])
+
+def write_processed(df: pd.DataFrame, path, fmt=DEFAULT_FORMAT):
+    """Sauvegarde le DataFrame traité ; parquet et feather conservent les types"""
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+
+def processed_columns(path, fmt=DEFAULT_FORMAT):
+    """Colonnes d'un fichier traité, sans charger les données"""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    if fmt == "feather":
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_processed(path, fmt=DEFAULT_FORMAT, columns=None):
+    """Charge un fichier traité en ne lisant que les colonnes demandées (si présentes).
+    Les formats colonnes sont lus en mémoire mappée."""
+    if columns is not None:
+        available = set(processed_columns(path, fmt))
+        columns = [col for col in columns if col in available]
+
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    if fmt == "feather":
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
@@ -1,46 +1,203 @@
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
 import pandas as pd
-from datetime import datetime
+from pandas.tseries.api import guess_datetime_format
 
-def transform_data(data: pd.DataFrame):
-    """Transforms raw data into a standardized format."""
+SCHEMA_SAMPLE_SIZE = 1000
+CATEGORY_MAX_RATIO = 0.5  # text columns with fewer distinct values than this share of the sample
+MAX_CACHED_SCHEMAS = 128
+NUMERIC_TEXT = r'\d*\.?\d*'
+MONGO_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_REPORTED_VALUES = 5
 
-    # Column name cleanup
+_schema_cache = OrderedDict()
+_schema_lock = threading.Lock()
+
+class SchemaMismatch(ValueError):
+    """Raised when a chunk holds values its column schema cannot convert"""
+
+def normalize_columns(data: pd.DataFrame):
+    """Column name cleanup"""
     data.columns = (
         data.columns.str.replace(r'[^0-9a-zA-Z]+', '_', regex=True)
         .str.lower()
         .str.strip()
     )
+    return data
 
-    # Drop completely empty columns
-    data = data.dropna(axis=1, how="all")
+def schema_key(source, columns):
+    """Cache key of a source (URL, file name...) and its header: files sharing a name but not their columns get their own schema"""
+    header = "\0".join(columns)
+    return hashlib.sha1(f"{source}\n{header}".encode()).hexdigest()
 
-    # Fill missing values
-    for col in data.select_dtypes(include=['number']).columns:
-        data[col] = data[col].fillna(0)  
+def parse_dates(values: pd.Series, fmt):
+    return pd.to_datetime(values, format=fmt, errors='coerce') if fmt else pd.to_datetime(values, errors='coerce')
 
-    for col in data.select_dtypes(include=['object']).columns:
-        data[col] = data[col].fillna('')
+def infer_date_format(values: pd.Series):
+    """Format parsing every value of the sample, guessed from its distinct values, None if there is none"""
+    candidates = []
+    with warnings.catch_warnings():
+        # Each guess is checked against every value below, the day-first warning does not apply
+        warnings.simplefilter("ignore", UserWarning)
+        for value in values.unique():
+            fmt = guess_datetime_format(value)
+            if fmt and fmt not in candidates:
+                candidates.append(fmt)
+    for fmt in candidates + ["ISO8601"]:
+        if parse_dates(values, fmt).notna().all():
+            return fmt
+    return None
 
-    # Remove duplicate rows
-    data = data.drop_duplicates()
+def infer_column(name, sample: pd.Series):
+    """Infer how a column should be converted from a sample of its values"""
+    values = sample.dropna().astype(str)
+    values = values[values != '']
+
+    if "date" in name or "timestamp" in name:
+        if not len(values):
+            return {"type": "datetime", "format": None}
+        fmt = infer_date_format(values)
+        # Dates in several formats are kept as text rather than parsed to NaT
+        return {"type": "datetime", "format": fmt} if fmt else {"type": "text"}
+
+    if pd.api.types.is_numeric_dtype(sample):
+        return {"type": "numeric"}
+
+    if len(values) and values.str.fullmatch(NUMERIC_TEXT).all():
+        return {"type": "numeric_text"}
+    if len(values) and values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+        return {"type": "category"}
+    return {"type": "text"}
+
+def present_values(values: pd.Series):
+    """Values that are neither missing nor empty strings"""
+    return values[values.notna() & (values.astype(str) != '')]
+
+def infer_schema(data: pd.DataFrame, sample_size=SCHEMA_SAMPLE_SIZE):
+    """Infer the column schema from the first values of each column"""
+    return {col: infer_column(col, present_values(data[col]).head(sample_size)) for col in data.columns}
+
+def read_schema(chunks, source=None, use_cache=True):
+    """Schema of a whole file, read and checked on every chunk before any of them is transformed.
+    Columns without a value in any chunk are left out; the others are typed from the first
+    chunk holding values for them, so the documents do not depend on where chunks start.
+    Raises SchemaMismatch, before anything is inserted, if a chunk does not fit the schema."""
+    schema, cached, key = {}, None, None
+    for data in chunks:
+        data = normalize_columns(data)
+        if cached is None:
+            key = schema_key(source, data.columns) if source else None
+            with _schema_lock:
+                cached = dict(_schema_cache.get(key, {})) if key and use_cache else {}
+        for col in data.columns:
+            if col not in schema and len(present_values(data[col])):
+                schema[col] = cached.get(col) or infer_schema(data[[col]])[col]
+        mismatches = check_schema(data, schema)
+        if mismatches:
+            if key:
+                forget_schema(key)
+            raise SchemaMismatch(describe_mismatches(mismatches, schema))
+    if key:
+        with _schema_lock:
+            _schema_cache[key] = schema
+            _schema_cache.move_to_end(key)
+            while len(_schema_cache) > MAX_CACHED_SCHEMAS:
+                _schema_cache.popitem(last=False)
+    return schema
+
+def file_schema(read_chunks, source=None):
+    """Schema of a file (see read_schema), read_chunks() returning a new iterator over its raw chunks.
+    The schema cached for the source is reused when the file fits it, otherwise it is inferred again."""
+    try:
+        return read_schema(read_chunks(), source)
+    except SchemaMismatch:
+        if not source:
+            raise
+        # The feed may have changed since its schema was cached: infer it from this file alone
+        return read_schema(read_chunks(), source, use_cache=False)
+
+def forget_schema(key):
+    with _schema_lock:
+        _schema_cache.pop(key, None)
+
+def convert_column(values: pd.Series, spec):
+    """(converted values, values that could not be converted) of a column for its schema entry"""
+    if spec["type"] in ("numeric", "numeric_text"):
+        converted = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors='coerce')
+    elif spec["type"] == "datetime":
+        converted = parse_dates(values, spec["format"])
+    else:
+        return values, values.iloc[:0]
+    present = values.notna() & (values.astype(str) != '')
+    return converted, values[present & converted.isna()]
 
-    # Convert datetime columns
+def check_schema(data: pd.DataFrame, schema):
+    """{column: first values that cannot be converted} of the columns of data that do not fit the schema"""
+    mismatches = {}
     for col in data.columns:
-        if "date" in col or "timestamp" in col:
-            try:
-                data[col] = pd.to_datetime(data[col], errors='coerce')
-                # Format datetime for MongoDB
-                data[col] = data[col].apply(lambda x: x if pd.isna(x) else x.strftime("%Y-%m-%d %H:%M:%S"))
-            except Exception as e:
-                print(f"Warning: Could not convert column '{col}' to datetime. Error: {e}")
-
-        # Convert text-based numeric columns to numbers
-        if data[col].dtype == 'object':  
-            if data[col].str.replace('.', '', 1).str.isnumeric().all():  # Check if all values are numbers
-                try:
-                    data[col] = pd.to_numeric(data[col], errors='coerce')
-                except Exception as e:
-                    print(f"Warning: Could not convert column '{col}' to numeric. Error: {e}")
+        if col in schema:
+            _, invalid = convert_column(data[col], schema[col])
+            if len(invalid):
+                mismatches[col] = invalid.unique()[:MAX_REPORTED_VALUES].tolist()
+    return mismatches
+
+def describe_mismatches(mismatches, schema):
+    details = "; ".join(f"'{col}' ({schema[col]['type']}): {values}" for col, values in mismatches.items())
+    return f"Values not matching the inferred column types: {details}"
+
+def apply_schema(data: pd.DataFrame, schema):
+    """Apply every conversion of the schema as vectorized column operations.
+    Raises SchemaMismatch instead of turning values that do not fit their column into 0 or NaT."""
+    columns = {name: [col for col in data.columns if schema[col]["type"] == name]
+               for name in ("datetime", "numeric", "numeric_text", "category", "text")}
+
+    mismatches = {}
+    for col in columns["numeric"] + columns["numeric_text"] + columns["datetime"]:
+        converted, invalid = convert_column(data[col], schema[col])
+        if len(invalid):
+            mismatches[col] = invalid.unique()[:MAX_REPORTED_VALUES].tolist()
+        data[col] = converted
+    if mismatches:
+        raise SchemaMismatch(describe_mismatches(mismatches, schema))
+
+    # Fill missing values (only values that were missing in the source are left as NaN above)
+    numeric = columns["numeric"] + columns["numeric_text"]
+    data[numeric] = data[numeric].fillna(0)
+    texts = columns["category"] + columns["text"]
+    data[texts] = data[texts].fillna('')
+
+    # Format datetime columns for MongoDB
+    for col in columns["datetime"]:
+        data[col] = data[col].dt.strftime(MONGO_DATE_FORMAT).where(data[col].notna(), None)
+
+    for col in columns["category"]:
+        data[col] = data[col].astype('category')
+    return data
+
+def transform_data(data: pd.DataFrame, source=None, schema=None):
+    """Transforms raw data into a standardized format.
+    schema is the one of the whole file when data is one of its chunks (see transform_file);
+    without it, the schema of data alone is read. Only the columns of the schema are kept."""
+
+    data = normalize_columns(data)
+    if schema is None:
+        schema = file_schema(lambda: [data], source)
+
+    # Drop the columns that are empty in the whole file
+    data = data[[col for col in data.columns if col in schema]].copy()
+    data = apply_schema(data, schema)
+
+    # Remove duplicate rows (within the chunk)
+    data = data.drop_duplicates()
 
     print(" Data transformation complete.")
     return data
+
+def transform_file(read_chunks, source=None):
+    """Transformed chunks of a file. read_chunks() returns a new iterator over its raw chunks:
+    the file is read and checked once for its schema, then again to be transformed chunk by chunk,
+    so a file that does not fit its schema fails before any chunk is inserted."""
+    schema = file_schema(read_chunks, source)
+    return (transform_data(chunk, schema=schema) for chunk in read_chunks())
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 import os
 from configETL import CONFIG, DATA_PATH, PROCESSED_DATA_PATH
+from .processedData import DEFAULT_FORMAT, processed_path, write_processed
 
 def load_csv(file_name):
     """ Charge un fichier CSV """
@@ -44,8 +45,10 @@ def apply_transformations(df: pd.DataFrame, transformations):
 
     return df
 
-def transform_data(file_key):
-    """ Transforme les données en utilisant la config YAML """
+def transform_data(file_key, since=None):
+    """ Transforme les données en utilisant la config YAML.
+    Si `since` est donné, seules les lignes postérieures à cette date sont gardées (exécution incrémentale).
+    Retourne le DataFrame transformé. """
     if file_key not in CONFIG["datasets"]:
         raise ValueError(f"Configuration pour '{file_key}' non trouvée.")
 
@@ -56,12 +59,19 @@ def transform_data(file_key):
     
     # Application des transformations
     df = apply_transformations(df, transformations)
+
+    # Filtrage incrémental : uniquement les lignes après le dernier chargement
+    if since is not None:
+        dates = pd.to_datetime(df[transformations.get("watermark_column", "date_debut")], errors="coerce")
+        df = df[dates > pd.Timestamp(since)]
     
-    # Sauvegarde du fichier transformé
-    output_path = os.path.join(PROCESSED_DATA_PATH, transformations["output_file"])
-    df.to_csv(output_path, index=False)
+    # Sauvegarde du fichier transformé (csv, parquet ou feather)
+    fmt = transformations.get("output_format", DEFAULT_FORMAT)
+    output_path = processed_path(PROCESSED_DATA_PATH, transformations["output_file"], fmt)
+    write_processed(df, output_path, fmt)
     
     print(f"Transformation terminée pour {file_key}. Fichier sauvegardé : {output_path}")
+    return df
 
 # if __name__ == "__main__":
 #     for file_key in CONFIG["files"]:
@@ -1,26 +1,32 @@
-OWD_covid_vaccinations = "https://catalog.ourworldindata.org/garden/covid/latest/vaccinations_global/vaccinations_global.csv"
 import pandas as pd
 import numpy as np
+from .clean_common import bornes_iqr, clean_by_group, corriger_aberrantes
+from .clean_partitions import DEFAULT_MEMORY_LIMIT, clean_out_of_core
 
-df_testing = pd.read_csv(OWD_covid_vaccinations)
-
-def clean_vaccination_data(data: pd.DataFrame) -> pd.DataFrame:
-    print("Début du nettoyage des données de vaccination...")
-
-    # Nettoyage des noms de colonnes
-    data.columns = (
-        data.columns.str.replace(r'[^0-9a-zA-Z]+', '', regex=True)
+def normaliser_colonnes(columns: pd.Index):
+    return (
+        columns.str.replace(r'[^0-9a-zA-Z]+', '', regex=True)
         .str.lower()
         .str.strip()
     )
 
-    print(f"Nombre Data : {data.shape}")
+# Première étape, indépendante d'un pays à l'autre : doublons, valeurs négatives et interpolation.
+# Retourne les données et les colonnes numériques.
+def preparer_vaccination_data(data: pd.DataFrame, drop_empty=False, verbose=True):
+    log = print if verbose else lambda *args: None
+
+    log("Début du nettoyage des données de vaccination...")
+
+    # Nettoyage des noms de colonnes
+    data.columns = normaliser_colonnes(data.columns)
+
+    log(f"Nombre Data : {data.shape}")
 
     # Cleaning de la colonne date
     try:
         data['date'] = pd.to_datetime(data['date'], errors='coerce')
     except Exception:
-        print("Attention: Impossible de convertir la colonne 'date'")
+        log("Attention: Impossible de convertir la colonne 'date'")
 
     # Tri et suppression des doublons
     data = data.sort_values(by=['country', 'date'])
@@ -29,51 +35,41 @@ def clean_vaccination_data(data: pd.DataFrame) -> pd.DataFrame:
     # Colonnes numériques
     numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
 
-    for col in numeric_cols:
-        data[col] = pd.to_numeric(data[col], errors='coerce') 
-        neg_count = (data[col] < 0).sum()
-        if neg_count > 0:
-            print(f"{neg_count} valeurs négatives corrigées dans '{col}'")
-            data.loc[data[col] < 0, col] = np.nan
-
-    # Interpolation par pays
-    for country in data['country'].unique():
-        mask = data['country'] == country
-        for col in numeric_cols:
-            data.loc[mask, col] = data.loc[mask, col].interpolate(method='linear')
+    # Négatifs -> NaN, interpolation par pays et remplissage des valeurs restantes
+    data, stats = clean_by_group(data, numeric_cols, group_col='country')
+    for col, neg_count in stats['negatifs'].items():
+        log(f"{neg_count} valeurs négatives corrigées dans '{col}'")
 
-    # Remplissage des valeurs restantes
-    for col in data.select_dtypes(include='number').columns:
-        data[col] = data[col].fillna(0)
+    return data, numeric_cols
 
-    for col in data.select_dtypes(include='object').columns:
-        if col != 'country':
-            data[col] = data[col].fillna('')
+# Dernière étape, ligne par ligne : colonnes dérivées temporelles
+def finaliser_vaccination_data(data: pd.DataFrame, verbose=True):
+    log = print if verbose else lambda *args: None
 
-    # Valeurs aberrantes
-    print("Traitement des valeurs aberrantes...")
-    for col in numeric_cols:
-        Q1 = data[col].quantile(0.25)
-        Q3 = data[col].quantile(0.75)
-        IQR = Q3 - Q1
-        min_val = max(0, Q1 - 1.5 * IQR)
-        max_val = Q3 + 1.5 * IQR
-
-        outliers = ((data[col] < min_val) | (data[col] > max_val)).sum()
-        if outliers > 0:
-            print(f"{outliers} valeurs aberrantes corrigées dans '{col}'")
-            data.loc[data[col] > max_val, col] = max_val
-            data.loc[data[col] < min_val, col] = min_val
-
-    # Colonnes dérivées temporelles
     if 'date' in data.columns and pd.api.types.is_datetime64_dtype(data['date']):
         data['year'] = data['date'].dt.year
         data['month'] = data['date'].dt.month
         data['week'] = data['date'].dt.isocalendar().week
-        print("Ajout des colonnes year, month, week")
+        log("Ajout des colonnes year, month, week")
 
-    print(f"Forme finale des données: {data.shape}")
-    print("Nettoyage terminé.")
+    log(f"Forme finale des données: {data.shape}")
+    log("Nettoyage terminé.")
     return data
 
-#clean_vaccination_data(df_testing)
\ No newline at end of file
+def clean_vaccination_data(data: pd.DataFrame) -> pd.DataFrame:
+    data, numeric_cols = preparer_vaccination_data(data)
+
+    # Valeurs aberrantes
+    print("Traitement des valeurs aberrantes...")
+    corrections = corriger_aberrantes(data, bornes_iqr(data, numeric_cols))
+    for col, outliers in corrections.items():
+        print(f"{outliers} valeurs aberrantes corrigées dans '{col}'")
+
+    return finaliser_vaccination_data(data)
+
+# Nettoyage hors mémoire : découpage par pays sur disque, nettoyage pays par pays, bornes IQR globales
+def clean_vaccination_data_out_of_core(source, sink, memory_limit=DEFAULT_MEMORY_LIMIT, workdir=None):
+    return clean_out_of_core(
+        source, sink, preparer_vaccination_data, finaliser_vaccination_data, drop_empty=False,
+        memory_limit=memory_limit, workdir=workdir,
+    )
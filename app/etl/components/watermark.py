@@ -0,0 +1,34 @@
+import hashlib
+import json
+import os
+from configETL import WATERMARK_PATH
+
+# Suivi des exécutions incrémentales : pour chaque dataset, la dernière date
+# traitée et l'empreinte du fichier source au moment du dernier chargement.
+
+def file_fingerprint(path, chunk_size=1024 * 1024):
+    """Empreinte SHA-256 du fichier source, lu par blocs"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def load_watermarks():
+    if not os.path.exists(WATERMARK_PATH):
+        return {}
+    with open(WATERMARK_PATH, "r") as file:
+        return json.load(file)
+
+def get_watermark(file_key):
+    """Dernier état enregistré du dataset ({"date": ..., "source_hash": ...}) ou None"""
+    return load_watermarks().get(file_key)
+
+def save_watermark(file_key, date, source_hash):
+    """Enregistre l'état du dataset (écriture atomique du fichier)"""
+    watermarks = load_watermarks()
+    watermarks[file_key] = {"date": date, "source_hash": source_hash}
+    tmp_path = WATERMARK_PATH + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(watermarks, file, indent=2)
+    os.replace(tmp_path, WATERMARK_PATH)
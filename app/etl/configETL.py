@@ -5,6 +5,7 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
 DATA_PATH = os.path.join(BASE_DIR, "data")
 PROCESSED_DATA_PATH = os.path.join(BASE_DIR, "processed_data")
+WATERMARK_PATH = os.path.join(PROCESSED_DATA_PATH, "watermarks.json")
 
 # Création des dossiers si nécessaire
 os.makedirs(DATA_PATH, exist_ok=True)
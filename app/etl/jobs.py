@@ -0,0 +1,234 @@
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from app.database.mongoClient import get_db
+
+UNFINISHED_STATES = ("queued", "running")
+
+
+class JobQueueFull(Exception):
+    """Raised when too many ETL jobs are already queued or running"""
+
+
+def current_worker():
+    """Host and pid of this API process (the pid changes in every gunicorn worker)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utc(value):
+    # MongoDB returns naive datetimes, in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_status(document, now=None):
+    """API view of a job document, elapsed time and throughput computed from its timestamps"""
+    started, finished = _utc(document.get("started_at")), _utc(document.get("finished_at"))
+    elapsed = None
+    if started is not None:
+        elapsed = ((finished or now or datetime.now(timezone.utc)) - started).total_seconds()
+    rows = document.get("rows", 0)
+    created = _utc(document.get("created_at"))
+    return {
+        "id": document["_id"],
+        "kind": document.get("kind"),
+        "collection": document.get("collection"),
+        "state": document.get("state"),
+        "rows": rows,
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        "elapsed": round(elapsed, 3) if elapsed is not None else None,
+        "error": document.get("error"),
+        "created_at": created.isoformat() if created else None,
+        "started_at": started.isoformat() if started else None,
+        "finished_at": finished.isoformat() if finished else None,
+    }
+
+
+class Job:
+    """State of an ETL job, updated by the worker thread running it and saved to the job store"""
+
+    def __init__(self, kind, collection, save=None, temp_path=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.collection = collection
+        self.state = "queued"
+        self.rows = 0
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.worker = current_worker()
+        self.temp_path = temp_path
+        self._save = save or (lambda job: None)
+
+    def save(self):
+        self._save(self)
+
+    def progress(self, rows):
+        self.rows = rows
+        self.save()
+
+    def keep_file(self, path):
+        """Record a temporary file of the job, removed if its process dies before the job ends"""
+        self.temp_path = path
+        self.save()
+
+    def to_document(self):
+        return {
+            "_id": self.id,
+            "kind": self.kind,
+            "collection": self.collection,
+            "state": self.state,
+            "rows": self.rows,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "worker": self.worker,
+            "temp_path": self.temp_path,
+        }
+
+    def to_dict(self):
+        return job_status(self.to_document())
+
+
+class MongoJobStore:
+    """Job documents in a MongoDB collection, so that every API process sees every job"""
+
+    def __init__(self, collection_name="etl_jobs"):
+        self.collection_name = collection_name
+
+    def _collection(self):
+        return get_db()[self.collection_name]
+
+    def save(self, job):
+        self._collection().replace_one({"_id": job.id}, job.to_document(), upsert=True)
+
+    def get(self, job_id):
+        return self._collection().find_one({"_id": job_id})
+
+    def list(self, limit):
+        return list(self._collection().find().sort("created_at", -1).limit(limit))
+
+    def unfinished(self):
+        return list(self._collection().find({"state": {"$in": list(UNFINISHED_STATES)}}))
+
+    def fail(self, job_id, error):
+        """Mark a job failed unless it finished in the meantime"""
+        self._collection().update_one(
+            {"_id": job_id, "state": {"$in": list(UNFINISHED_STATES)}},
+            {"$set": {"state": "failed", "error": error, "finished_at": datetime.now(timezone.utc)}},
+        )
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_orphan(document):
+    """Unfinished job whose process, on this host, has exited (worker killed, recycled or restarted).
+    Jobs of other hosts cannot be checked from here and are never reported as orphans."""
+    host, _, pid = (document.get("worker") or "").rpartition(":")
+    return (document.get("state") in UNFINISHED_STATES and host == socket.gethostname()
+            and pid.isdigit() and not _process_alive(int(pid)))
+
+
+class JobManager:
+    """Runs ETL jobs on a bounded thread pool of this process; their state lives in a shared job store.
+    The queue limit applies per process, any process can answer status queries."""
+
+    def __init__(self, max_workers=2, max_pending=10, history=100, store=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+        self.store = store or MongoJobStore()
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, collection, func, *args, temp_path=None):
+        """Queue func(job, *args); func returns the number of rows processed.
+        temp_path is a file owned by the job, removed if its process dies before the job ends."""
+        self.recover_orphans()
+        job = Job(kind, collection, save=self.store.save, temp_path=temp_path)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} ETL jobs already queued or running")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etl-job")
+            self._pending += 1
+        try:
+            job.save()
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        self._executor.submit(self._run, job, func, *args)
+        return job
+
+    def get(self, job_id):
+        """Status of a job (dict), whichever process runs it, None if unknown"""
+        document = self.store.get(job_id)
+        if document is None:
+            return None
+        if is_orphan(document):
+            self._fail_orphan(document)
+            document = self.store.get(job_id)
+        return job_status(document)
+
+    def list(self):
+        """Status of the most recent jobs"""
+        self.recover_orphans()
+        return [job_status(document) for document in self.store.list(self.history)]
+
+    def recover_orphans(self):
+        """Fail the unfinished jobs left by dead processes of this host and remove their files"""
+        for document in self.store.unfinished():
+            if is_orphan(document):
+                self._fail_orphan(document)
+
+    def _fail_orphan(self, document):
+        self.store.fail(document["_id"], "API process exited before the job finished")
+        path = document.get("temp_path")
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _run(self, job, func, *args):
+        try:
+            job.state = "running"
+            job.started_at = datetime.now(timezone.utc)
+            job.save()
+            job.rows = func(job, *args)
+            job.state = "done"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            with self._lock:
+                self._pending -= 1
+            try:
+                job.save()
+            except Exception:
+                traceback.print_exc()
+
+
+job_manager = JobManager()
+
+def init_jobs(app):
+    """Configure the ETL job pool with the Flask app."""
+    job_manager.max_workers = app.config.get("ETL_JOB_WORKERS", job_manager.max_workers)
+    job_manager.max_pending = app.config.get("ETL_JOB_MAX_PENDING", job_manager.max_pending)
+    job_manager.store.collection_name = app.config.get("ETL_JOBS_COLLECTION", job_manager.store.collection_name)
@@ -1,11 +1,12 @@
 import argparse
-import io
+import itertools
+import os
 import pandas as pd
-import requests
 import yaml
 from config import Config
-from app.etl.components.mongodb import insert_data
-from app.etl.components.transform import transform_data
+from app.etl.components.mongodb import insert_chunks
+from app.etl.components.extract import download_csv
+from app.etl.components.transform import transform_file
 
 def load_queries():
     with open("app/etl/queries.yaml", "r") as file:
@@ -19,11 +20,6 @@ def get_url(url_name):
     urls = load_queries()["urls"]
     return urls.get(url_name, None)
 
-def download_csv(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.content.decode('utf-8')
-
 def main():
     parser = argparse.ArgumentParser(description="ETL CLI Tool")
     group = parser.add_mutually_exclusive_group(required=True)
@@ -35,21 +31,20 @@ def main():
     parser.add_argument('--collection', type=str, required=True, help='postgres_raw table name')
     args = parser.parse_args()
 
-    raw_data = None
+    path = None
+    downloaded = None
 
-    # Standardizing input as a DataFrame
+    # Standardizing input as an iterator of DataFrame chunks
     if args.csv_file:
-        raw_data = pd.read_csv(args.csv_file)
+        path = args.csv_file
     elif args.download_url:
-        csv_content = download_csv(args.download_url)
-        raw_data = pd.read_csv(io.StringIO(csv_content))
+        path = downloaded = download_csv(args.download_url)
     elif args.download_url_name:
         url = get_url(args.download_url_name)
         if not url:
             print(f"URL '{args.download_url_name}' not found! Check queries.yaml.")
             exit()
-        csv_content = download_csv(url)
-        raw_data = pd.read_csv(io.StringIO(csv_content))
+        path = downloaded = download_csv(url)
     else:
         if args.query_name:
             sql_query = get_query(args.query_name)
@@ -61,31 +56,38 @@ def main():
 
         # raw_data = fetch_data(mariadb_config, sql_query)
 
-    if raw_data is None:
+    if path is None:
         print("No data source provided. Exiting.")
         return
 
-    # Now transform_data() always gets a DataFrame
-    transformed_data = transform_data(raw_data)
-    
-    if transformed_data.empty:
-        print("No data available after transformation.")
-        return
-    
-    # Show sample and column types before proceeding
-    print("\n Sample of transformed data:")
-    print(transformed_data.head(5))  # Show first 5 rows
-    print("\n Column types:")
-    print(transformed_data.dtypes)
+    try:
+        # Now transform_data() always gets a DataFrame, one chunk at a time, with the schema of the whole file
+        source = args.csv_file or args.download_url or args.download_url_name
+        read_chunks = lambda: pd.read_csv(path, chunksize=Config.ETL_CHUNK_SIZE)
+        transformed_chunks = transform_file(read_chunks, source=source)
+        first_chunk = next(transformed_chunks, None)
 
-    confirm = input("\nProceed with database insertion? (Y/N): ").strip().lower()
-    if confirm != 'y':
-        print("Insertion aborted.")
-        return
-    else:
-        print("Inserting data into database...")
+        if first_chunk is None or first_chunk.empty:
+            print("No data available after transformation.")
+            return
+
+        # Show sample and column types before proceeding
+        print("\n Sample of transformed data:")
+        print(first_chunk.head(5))  # Show first 5 rows
+        print("\n Column types:")
+        print(first_chunk.dtypes)
+
+        confirm = input("\nProceed with database insertion? (Y/N): ").strip().lower()
+        if confirm != 'y':
+            print("Insertion aborted.")
+            return
+        else:
+            print("Inserting data into database...")
 
-    insert_data(Config.MONGODB_CONFIG, transformed_data, args.collection)
+        insert_chunks(itertools.chain([first_chunk], transformed_chunks), args.collection)
+    finally:
+        if downloaded:
+            os.remove(downloaded)
 
 if __name__ == "__main__":
     main()
@@ -3,23 +3,171 @@
 # if __name__ == "__main__":
 #     main()
 
-from components.extract import extract_csv
+import argparse
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
 from components.transformToDataBase import transform_data
 from components.loadToDataBase import load_data
-from configETL import CONFIG
+from components.watermark import file_fingerprint, get_watermark, save_watermark
+from configETL import CONFIG, DATA_PATH
 
-def run_etl():
-    print
+# Taille en mémoire d'un DataFrame par rapport à son CSV (estimation)
+MEMORY_FACTOR = 5
 
-    print("🔄 Extraction et Transformation des fichiers...")
-    for file_key in CONFIG["datasets"]:
-        transform_data(file_key)
+def run_dataset(file_key, full=False):
+    """Traite un dataset ; en mode incrémental, seules les lignes postérieures au dernier chargement sont traitées.
+    Retourne (nombre de lignes chargées, nouveau watermark ou None)"""
+    config = CONFIG["datasets"][file_key]
+    source_hash = file_fingerprint(os.path.join(DATA_PATH, config["input_file"]))
+    watermark = None if full else get_watermark(file_key)
 
-    # print("🔄 Chargement des données dans PostgreSQL...")
-    # for file_key in CONFIG["files"]:
-    #     load_data(file_key)
+    if watermark and watermark["source_hash"] == source_hash:
+        print(f"⏭️ {file_key} : source inchangée, rien à traiter.")
+        return 0, None
 
-    print("✅ Pipeline terminé !")
+    since = watermark["date"] if watermark else None
+    df = transform_data(file_key, since=since)
+    if df.empty:
+        print(f"⏭️ {file_key} : aucune nouvelle ligne depuis {since}.")
+        return 0, (since, source_hash)
+
+    print(f"🔄 Chargement de {len(df)} lignes de {file_key} dans PostgreSQL...")
+    # load_data lève une exception si le chargement échoue : aucun watermark n'est alors retourné,
+    # et les lignes seront retraitées à la prochaine exécution.
+    # Les rapports postérieurs à `since` sont remplacés, un rechargement ne crée donc pas de doublons.
+    rejetees = load_data(file_key, since=since)
+
+    column = config.get("watermark_column", "date_debut")
+    dates = pd.to_datetime(df[column], errors="coerce")
+    if not rejetees.empty:
+        # Le watermark reste avant la première ligne rejetée (pays inconnu...) et l'empreinte n'est pas
+        # enregistrée : ces lignes seront rechargées à la prochaine exécution, une fois la référence ajoutée
+        first_rejected = pd.to_datetime(rejetees[column], errors="coerce").min()
+        if pd.notna(first_rejected):
+            dates = dates[dates < first_rejected]
+        source_hash = None
+    last_date = dates.max()
+    return len(df) - len(rejetees), (last_date.isoformat() if pd.notna(last_date) else since, source_hash)
+
+def timed_run(file_key, full=False):
+    """Exécute un dataset en capturant sa durée et son éventuelle erreur"""
+    start = time.perf_counter()
+    result = {"dataset": file_key, "rows": 0, "watermark": None, "error": None}
+    try:
+        result["rows"], result["watermark"] = run_dataset(file_key, full=full)
+    except Exception as e:
+        traceback.print_exc()
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def estimate_memory(file_key):
+    """Mémoire estimée (en octets) pour traiter un dataset, d'après la taille de son fichier source"""
+    config = CONFIG["datasets"][file_key]
+    path = os.path.join(DATA_PATH, config["input_file"])
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    return size * config.get("memory_factor", MEMORY_FACTOR)
+
+def failed_run(file_key, error, started):
+    """Résultat d'un dataset dont le processus n'a pas rendu de résultat"""
+    return {"dataset": file_key, "rows": 0, "watermark": None,
+            "error": f"{type(error).__name__}: {error}", "elapsed": time.perf_counter() - started}
+
+def run_pool(pending, jobs, memory_budget, full, results):
+    """Exécute les datasets en attente dans un pool de processus, jusqu'à ce qu'ils soient tous terminés
+    ou que le pool soit cassé (processus tué, par exemple faute de mémoire).
+    Les résultats sont ajoutés à `results` ; retourne les datasets qui n'ont pas été lancés."""
+    pending = list(pending)
+    running = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            in_use = sum(memory for _, memory, _ in running.values())
+            for item in list(pending):
+                if len(running) >= jobs:
+                    break
+                file_key, memory = item
+                if memory_budget is None or not running or in_use + memory <= memory_budget:
+                    try:
+                        future = executor.submit(timed_run, file_key, full)
+                    except BrokenProcessPool:
+                        break
+                    pending.remove(item)
+                    running[future] = (file_key, memory, time.perf_counter())
+                    in_use += memory
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                file_key, _, started = running.pop(future)
+                try:
+                    results.append(future.result())
+                except BrokenProcessPool as e:
+                    broken = True
+                    results.append(failed_run(file_key, e, started))
+                except Exception as e:
+                    results.append(failed_run(file_key, e, started))
+
+            if broken:
+                # Tous les datasets en cours échouent avec le pool ; on ne sait pas lequel a tué le processus
+                for future, (file_key, _, started) in running.items():
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(failed_run(file_key, e, started))
+                return pending
+    return pending
+
+def run_parallel(file_keys, jobs, memory_budget=None, full=False):
+    """Exécute les datasets dans un pool de processus.
+    Un dataset n'est lancé que si la mémoire estimée des datasets en cours reste sous le budget
+    (un dataset plus gros que le budget est lancé seul).
+    Si un processus meurt, les datasets en cours sont marqués en échec et les suivants relancés dans un nouveau pool."""
+    pending = [(file_key, estimate_memory(file_key)) for file_key in file_keys]
+    results = []
+    while pending:
+        remaining = run_pool(pending, jobs, memory_budget, full, results)
+        if len(remaining) == len(pending):
+            # Aucun dataset n'a pu être lancé : le pool est inutilisable
+            error = BrokenProcessPool("aucun processus disponible")
+            results += [failed_run(file_key, error, time.perf_counter()) for file_key, _ in remaining]
+            break
+        pending = remaining
+    return results
+
+def run_etl(full=False, jobs=1, memory_budget=None):
+    print("🔄 Extraction, transformation et chargement des fichiers...")
+    start = time.perf_counter()
+    file_keys = list(CONFIG["datasets"])
+    if jobs > 1 and len(file_keys) > 1:
+        results = run_parallel(file_keys, jobs, memory_budget, full=full)
+    else:
+        results = [timed_run(file_key, full=full) for file_key in file_keys]
+
+    # Les watermarks sont écrits par le processus principal, une fois le dataset chargé
+    for result in results:
+        if result["watermark"] and not result["error"]:
+            save_watermark(result["dataset"], *result["watermark"])
+
+    for result in results:
+        status = f"❌ {result['error']}" if result["error"] else f"{result['rows']} lignes"
+        print(f"  {result['dataset']} : {result['elapsed']:.2f}s - {status}")
+
+    failed = [result["dataset"] for result in results if result["error"]]
+    print(f"{'⚠️ Pipeline terminé avec des erreurs' if failed else '✅ Pipeline terminé'} "
+          f"en {time.perf_counter() - start:.2f}s ({len(results) - len(failed)}/{len(results)} datasets).")
+    return results
 
 if __name__ == "__main__":
-    run_etl()
+    parser = argparse.ArgumentParser(description="Pipeline ETL des datasets de config.yaml")
+    parser.add_argument("--full", action="store_true", help="Retraite toutes les lignes en ignorant les watermarks")
+    parser.add_argument("--jobs", type=int, default=1, help="Nombre de datasets traités en parallèle (processus)")
+    parser.add_argument("--memory-budget", type=int, help="Mémoire maximale (Mo) des datasets traités en même temps")
+    args = parser.parse_args()
+    budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    results = run_etl(full=args.full, jobs=args.jobs, memory_budget=budget)
+    if any(result["error"] for result in results):
+        raise SystemExit(1)
@@ -0,0 +1,89 @@
+import argparse
+import importlib
+import os
+from collections import namedtuple
+import pandas as pd
+
+# A dataset goes from a source (URL name in queries.yaml, URL or path) through a cleaner to a sink (MongoDB collection).
+# Cleaners are referenced as "module:function" and only imported when their dataset is run,
+# so importing the registry neither imports the cleaners nor reads any data.
+Dataset = namedtuple("Dataset", ["name", "source", "cleaner", "out_of_core_cleaner", "collection"])
+
+DATASETS = {
+    "owid_testing": Dataset(
+        "owid_testing", "OWID_Testing",
+        ".components.transforme_clean_testingdata:clean_testingdata",
+        ".components.transforme_clean_testingdata:clean_testingdata_out_of_core",
+        "owid_testing",
+    ),
+    "owid_vaccinations": Dataset(
+        "owid_vaccinations", "OWID_Vaccinations",
+        ".components.transforme_clean_vacdata:clean_vaccination_data",
+        ".components.transforme_clean_vacdata:clean_vaccination_data_out_of_core",
+        "owid_vaccinations",
+    ),
+}
+
+def get_dataset(name):
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ValueError(f"Unknown dataset '{name}' ({', '.join(DATASETS)})")
+    return dataset
+
+def load_function(reference):
+    """Import "module:function" (module relative to this package) on first use"""
+    module_name, function_name = reference.split(":")
+    return getattr(importlib.import_module(module_name, __package__), function_name)
+
+def resolve_source(source):
+    """URL name from queries.yaml, or the source itself (URL or path)"""
+    from .main import get_url
+    return get_url(source) or source
+
+def mongo_sink(collection_name):
+    """Sink inserting every DataFrame it receives into a MongoDB collection"""
+    from .components.mongodb import get_db
+    collection = get_db()[collection_name]
+
+    def sink(data: pd.DataFrame):
+        if not data.empty:
+            collection.insert_many(data.to_dict('records'))
+    return sink
+
+def run_dataset(name, out_of_core=False, memory_limit=None):
+    """Download, clean and store a registered dataset; returns the number of rows stored"""
+    from .components.extract import download_csv
+    from .components.mongodb import ensure_indexes
+
+    dataset = get_dataset(name)
+    source = resolve_source(dataset.source)
+    downloaded = download_csv(source) if source.startswith(("http://", "https://")) else None
+    path = downloaded or source
+    sink = mongo_sink(dataset.collection)
+    try:
+        if out_of_core:
+            clean = load_function(dataset.out_of_core_cleaner)
+            kwargs = {"memory_limit": memory_limit} if memory_limit else {}
+            rows = clean(path, sink, **kwargs)
+        else:
+            clean = load_function(dataset.cleaner)
+            data = clean(pd.read_csv(path))
+            sink(data)
+            rows = len(data)
+    finally:
+        if downloaded:
+            os.remove(downloaded)
+
+    print(f"{rows} rows of '{name}' stored in MongoDB collection '{dataset.collection}'.")
+    if rows:
+        ensure_indexes(dataset.collection)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a registered dataset (source -> cleaner -> MongoDB)")
+    parser.add_argument("dataset", choices=sorted(DATASETS), help="Registered dataset name")
+    parser.add_argument("--out-of-core", action="store_true", help="Partition the source by country on disk instead of loading it in memory")
+    parser.add_argument("--memory-limit", type=int, help="Memory ceiling in MB for the out-of-core mode")
+    args = parser.parse_args()
+    run_dataset(args.dataset, out_of_core=args.out_of_core,
+                memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None)
@@ -1,19 +1,23 @@
 from sqlalchemy import Column, String, ForeignKey, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from app.db import db
 
 class Concerne(db.Model):
     __tablename__ = 'concerne'
+    # code_continent is the leading column of the primary key, the other columns need their own index
     
     code_continent = Column(String, ForeignKey('continent.code_continent', ondelete='CASCADE'), primary_key=True, nullable=False)
-    code_pays = Column(String, ForeignKey('pays.code_pays', ondelete='CASCADE'), primary_key=True, nullable=False)
-    code_region = Column(String, ForeignKey('region.code_region', ondelete='CASCADE'), primary_key=True, nullable=False)
-    code_rapport = Column(Integer, ForeignKey('rapport.id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    code_pays = Column(String, ForeignKey('pays.code_pays', ondelete='CASCADE'), primary_key=True, nullable=False, index=True)
+    code_region = Column(String, ForeignKey('region.code_region', ondelete='CASCADE'), primary_key=True, nullable=False, index=True)
+    # No foreign key to the partitioned rapport table (rapport.id alone is not unique there),
+    # triggers check the rapport and cascade its deletes instead
+    code_rapport = Column(Integer, primary_key=True, nullable=False, index=True)
 
     continent = relationship('Continent', backref='concernes')
     pays = relationship('Pays', backref='concernes')
     region = relationship('Region', backref='concernes')
-    rapport = relationship('Rapport', backref='concernes')
+    rapport = relationship('Rapport', primaryjoin='Concerne.code_rapport == Rapport.id', foreign_keys=[code_rapport],
+                           backref=backref('concernes', passive_deletes='all'))
 
     def to_dict(self):
         return {
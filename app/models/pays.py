@@ -10,7 +10,7 @@ class Pays(db.Model):
     nom = Column(String(50), nullable=False)
     pib = Column(Integer, nullable=True)
     temperature = Column(DECIMAL(15, 2), nullable=True)  # Added precision
-    code_continent = Column(String, ForeignKey('continent.code_continent', ondelete='CASCADE'), nullable=False)
+    code_continent = Column(String, ForeignKey('continent.code_continent', ondelete='CASCADE'), nullable=False, index=True)
     continent = relationship('Continent', back_populates='pays')
     regions = relationship('Region', back_populates='pays', cascade='all, delete-orphan')
 
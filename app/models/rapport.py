@@ -1,12 +1,19 @@
-from sqlalchemy import Column, String, Integer, Date, ForeignKey, Identity
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, Identity, Index
 from sqlalchemy.orm import relationship
 from app.db import db
 
 class Rapport(db.Model):
     __tablename__ = 'rapport'
+    __table_args__ = (
+        # code_maladie alone is served by the leading column of the composite index
+        Index('ix_rapport_code_maladie_date_debut', 'code_maladie', 'date_debut'),
+        # Partitions are managed by app/database/partitions.py
+        {'postgresql_partition_by': 'RANGE (date_debut)'},
+    )
     
     id = Column(Integer, Identity(start=1, increment=1), primary_key=True)
-    date_debut = Column(Date, nullable=False)
+    # Part of the primary key: a partitioned table only enforces keys that include the partition key
+    date_debut = Column(Date, primary_key=True, nullable=False, index=True)
     date_fin = Column(Date, nullable=False)
     source = Column(String(50))
     nouveaux_cas = Column(Integer, default=0)
@@ -16,7 +23,7 @@ class Rapport(db.Model):
     taux_mortalite = Column(Integer)
     taux_guerison = Column(Integer)
     code_maladie = Column(Integer, ForeignKey('maladie.id', ondelete='CASCADE'), nullable=False)
-    code_periode = Column(Integer, ForeignKey('periode.id', ondelete='CASCADE'), nullable=False)
+    code_periode = Column(Integer, ForeignKey('periode.id', ondelete='CASCADE'), nullable=False, index=True)
     maladie = relationship('Maladie', back_populates='rapports')
     periode = relationship('Periode', back_populates='rapports')
 
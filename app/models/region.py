@@ -8,7 +8,7 @@ class Region(db.Model):
     id = Column(Integer, Identity(start=1, increment=1), primary_key=True)
     code_region = Column(String(50), unique=True, nullable=False)
     nom = Column(String(50), nullable=False)
-    code_pays = Column(String, ForeignKey('pays.code_pays', ondelete='CASCADE'), nullable=False)
+    code_pays = Column(String, ForeignKey('pays.code_pays', ondelete='CASCADE'), nullable=False, index=True)
     pays = relationship('Pays', back_populates='regions')
 
     def to_dict(self):
@@ -0,0 +1,125 @@
+import datetime
+from decimal import Decimal
+from sqlalchemy import BigInteger, Date, Float, Integer, Numeric, SmallInteger, String
+from sqlalchemy.dialects import postgresql
+
+MAX_BULK_ITEMS = 5000
+# Postgres integer ranges: an out of range value would fail the whole statement
+INTEGER_BITS = ((BigInteger, 64), (SmallInteger, 16), (Integer, 32))
+
+def _integer_range(column_type):
+    bits = next(bits for type_, bits in INTEGER_BITS if isinstance(column_type, type_))
+    return -2 ** (bits - 1), 2 ** (bits - 1) - 1
+
+def _convert(column, value):
+    """Check a JSON value against a column type, raises ValueError"""
+    if value is None:
+        if not column.nullable:
+            raise ValueError(f"'{column.key}' is required")
+        return None
+    if isinstance(column.type, String):
+        if not isinstance(value, str):
+            raise ValueError(f"'{column.key}' must be a string")
+        if column.type.length and len(value) > column.type.length:
+            raise ValueError(f"'{column.key}' is longer than {column.type.length} characters")
+        return value
+    if isinstance(column.type, Integer):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"'{column.key}' must be an integer")
+        low, high = _integer_range(column.type)
+        if not low <= value <= high:
+            raise ValueError(f"'{column.key}' must be between {low} and {high}")
+        return value
+    if isinstance(column.type, Numeric):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"'{column.key}' must be a number")
+        number = Decimal(str(value))
+        if not number.is_finite():
+            raise ValueError(f"'{column.key}' must be a finite number")
+        precision, scale = column.type.precision, column.type.scale or 0
+        # NUMERIC(p, s) rounds to s decimals and holds values below 10^(p - s)
+        if precision and not isinstance(column.type, Float) and abs(round(number, scale)) >= 10 ** (precision - scale):
+            raise ValueError(f"'{column.key}' must be lower than 10^{precision - scale} in absolute value")
+        return number
+    if isinstance(column.type, Date):
+        try:
+            return datetime.date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{column.key}' must be a date (YYYY-MM-DD)")
+    return value
+
+def validate_items(model, items):
+    """Validate and convert the items of a bulk request.
+    Returns (rows, errors): rows are (index, values) pairs, errors {"index", "error"} dicts."""
+    columns = {column.key: column for column in model.__table__.columns if column.identity is None}
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "Item must be an object"})
+            continue
+        unknown = sorted(set(item) - set(columns))
+        if unknown:
+            errors.append({"index": index, "error": f"Unknown fields: {', '.join(unknown)}"})
+            continue
+        try:
+            values = {name: _convert(column, item.get(name, column.default.arg if column.default is not None else None))
+                      for name, column in columns.items()}
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        rows.append((index, values))
+    return rows, errors
+
+def check_references(session, rows, errors, references):
+    """Reject the rows pointing to missing parents, with one IN query per foreign key"""
+    for name, column in references.items():
+        wanted = {values[name] for _, values in rows if values[name] is not None}
+        if not wanted:
+            continue
+        found = {value for (value,) in session.query(column).filter(column.in_(wanted))}
+        kept = []
+        for index, values in rows:
+            if values[name] is not None and values[name] not in found:
+                errors.append({"index": index, "error": f"Unknown {name} '{values[name]}'"})
+            else:
+                kept.append((index, values))
+        rows = kept
+    return rows
+
+def drop_duplicate_keys(rows, errors, key):
+    """An upsert cannot touch the same row twice: later duplicates of a key are rejected"""
+    seen, kept = set(), []
+    for index, values in rows:
+        value = tuple(values[name] for name in key)
+        if value in seen:
+            errors.append({"index": index, "error": f"Duplicate key {', '.join(map(str, value))} in request"})
+            continue
+        seen.add(value)
+        kept.append((index, values))
+    return kept
+
+def bulk_upsert(session, model, items, key=None, references=None):
+    """Insert or update items in one INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING statement.
+    Items replace the stored values of existing keys; without key, items are only inserted.
+    Returns (stored rows as dicts, in request order, per-item errors sorted by index)."""
+    rows, errors = validate_items(model, items)
+    if key:
+        rows = drop_duplicate_keys(rows, errors, key)
+    rows = check_references(session, rows, errors, references or {})
+    errors.sort(key=lambda error: error["index"])
+    if not rows:
+        return [], errors
+
+    table = model.__table__
+    stmt = postgresql.insert(table)
+    if key:
+        updated = [column.key for column in table.columns if column.identity is None and column.key not in key]
+        # With only key columns, rewrite one of them so that existing rows are returned as well
+        updated = updated or key[-1:]
+        stmt = stmt.on_conflict_do_update(index_elements=key, set_={name: stmt.excluded[name] for name in updated})
+    stmt = stmt.returning(*table.columns, sort_by_parameter_order=True)
+
+    result = session.execute(stmt, [values for _, values in rows])
+    stored = [dict(row._mapping) for row in result]
+    session.commit()
+    return stored, errors
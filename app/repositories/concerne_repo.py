@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from app import models
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.expand import with_expand
 
 class ConcerneRepository:
     """Repository for managing Concerne data"""
@@ -16,10 +19,30 @@ class ConcerneRepository:
         self.db_session.refresh(concerne)
         return concerne
 
+    def bulk_upsert(self, items: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Create concerne entries, existing composite keys are kept, in one statement, returns (rows, errors)"""
+        return bulk_upsert(self.db_session, models.Concerne, items, key=["code_continent", "code_pays", "code_region", "code_rapport"], references={
+            "code_continent": models.Continent.code_continent,
+            "code_pays": models.Pays.code_pays,
+            "code_region": models.Region.code_region,
+            "code_rapport": models.Rapport.id,
+        })
+
     def get_all(self) -> List[models.Concerne]:
         """Retrieve all concerne entries"""
         return self.db_session.query(models.Concerne).all()
 
+    def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, expand: Optional[List[str]] = None, **filters) -> Tuple[List[models.Concerne], Optional[str]]:
+        """Retrieve a page of concerne entries ordered by their composite key, with the expanded relations loaded"""
+        query = with_expand(self.db_session.query(models.Concerne), models.Concerne, expand)
+        query = apply_filters(query, models.Concerne, filters)
+        return paginate(query, [
+            models.Concerne.code_continent,
+            models.Concerne.code_pays,
+            models.Concerne.code_region,
+            models.Concerne.code_rapport,
+        ], limit, cursor)
+
     def delete(self, code_continent: str, code_pays: str, code_region: str, code_rapport: int) -> bool:
         """Delete a concerne entry by its composite key"""
         concerne = self.db_session.query(models.Concerne).filter(
@@ -1,4 +1,8 @@
 from app.models import Continent
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.cache import response_cache
 
 class ContinentRepository:
     """Repository for managing Continent data"""
@@ -10,22 +14,43 @@ class ContinentRepository:
         """Retrieve all continents"""
         return self.db_session.query(Continent).all()
 
+    def get_page(self, limit=None, cursor=None, **filters):
+        """Retrieve a page of continents ordered by ID, optionally filtered"""
+        query = apply_filters(self.db_session.query(Continent), Continent, filters)
+        return paginate(query, [Continent.id], limit, cursor)
+
     def get_by_id(self, id):
         """Retrieve a continent by its ID"""
         return self.db_session.query(Continent).filter_by(id=id).first()
 
+    def get_by_ids(self, ids):
+        """Retrieve continents by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Continent), Continent.id, ids)
+
     def get_by_code(self, code_continent):
         """Retrieve a continent by its code"""
         return self.db_session.query(Continent).filter_by(code_continent=code_continent).first()
 
+    def get_by_codes(self, codes):
+        """Retrieve continents by their codes in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Continent), Continent.code_continent, codes)
+
     def create(self, code_continent, nom):
         """Create a new continent"""
         new_continent = Continent(code_continent=code_continent, nom=nom)
         self.db_session.add(new_continent)
         self.db_session.commit()
+        response_cache.invalidate("continent")
         self.db_session.refresh(new_continent)
         return new_continent
 
+    def bulk_upsert(self, items):
+        """Create or update continents by code_continent in one statement, returns (rows, errors)"""
+        stored, errors = bulk_upsert(self.db_session, Continent, items, key=["code_continent"])
+        if stored:
+            response_cache.invalidate("continent")
+        return stored, errors
+
     def update(self, id, **data):
         """Update an existing continent"""
         continent = self.get_by_id(id)
@@ -34,6 +59,7 @@ class ContinentRepository:
         for key, value in data.items():
             setattr(continent, key, value)
         self.db_session.commit()
+        response_cache.invalidate("continent")
         return continent
 
     def delete(self, id):
@@ -43,4 +69,5 @@ class ContinentRepository:
             return False
         self.db_session.delete(continent)
         self.db_session.commit()
+        response_cache.invalidate("continent")
         return True
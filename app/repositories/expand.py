@@ -0,0 +1,40 @@
+from collections import defaultdict
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+def _loaded_by_key(relationship):
+    """Collections joined on a single column that is not the parent primary key (pays.regions on code_pays).
+    selectinload would JOIN the parent table and filter it on its primary keys, hiding the key values
+    from the planner, which then reads the whole child table instead of its index on the key."""
+    pairs = relationship.property.local_remote_pairs
+    return (relationship.property.uselist and len(pairs) == 1
+            and list(relationship.property.parent.primary_key) != [pairs[0][0]])
+
+def with_expand(query, model, expand=None):
+    """Eager load the requested relationships of model: many-to-one ones in the same
+    SELECT (JOIN), collections with one extra SELECT ... IN per relationship.
+    Collections keyed on another column than the primary key are loaded by load_expanded."""
+    for name in expand or ():
+        relationship = getattr(model, name)
+        if not relationship.property.uselist:
+            query = query.options(joinedload(relationship))
+        elif not _loaded_by_key(relationship):
+            query = query.options(selectinload(relationship))
+    return query
+
+def load_expanded(session, items, model, expand=None):
+    """Load the expanded collections left by with_expand with one SELECT ... WHERE key IN (...) each"""
+    for name in expand or ():
+        relationship = getattr(model, name)
+        if not items or not _loaded_by_key(relationship):
+            continue
+        (local, remote), = relationship.property.local_remote_pairs
+        local_key = relationship.property.parent.get_property_by_column(local).key
+        remote_key = relationship.property.mapper.get_property_by_column(remote).key
+        children = defaultdict(list)
+        keys = {getattr(item, local_key) for item in items}
+        for child in session.query(relationship.property.mapper).filter(remote.in_(keys)):
+            children[getattr(child, remote_key)].append(child)
+        for item in items:
+            set_committed_value(item, name, children[getattr(item, local_key)])
+    return items
@@ -0,0 +1,9 @@
+MAX_LOOKUP_VALUES = 1000
+
+def get_many(query, column, values):
+    """Fetch the rows whose column matches one of values with a single IN query.
+    Returns one row per requested value, in request order, None for misses."""
+    if not values:
+        return []
+    found = {getattr(row, column.key): row for row in query.filter(column.in_(set(values)))}
+    return [found.get(value) for value in values]
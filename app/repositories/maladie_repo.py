@@ -1,8 +1,12 @@
 from app.models.maladie import Maladie
 from app.db import db
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app import models
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.cache import response_cache
 
 class MaladieRepository:
     """Repository for managing Maladie data"""
@@ -15,17 +19,34 @@ class MaladieRepository:
         maladie = models.Maladie(**kwargs)
         self.db_session.add(maladie)
         self.db_session.commit()
+        response_cache.invalidate("maladie")
         self.db_session.refresh(maladie)
         return maladie
 
+    def bulk_upsert(self, items: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Create or update maladies by nom in one statement, returns (rows, errors)"""
+        stored, errors = bulk_upsert(self.db_session, models.Maladie, items, key=["nom"])
+        if stored:
+            response_cache.invalidate("maladie")
+        return stored, errors
+
     def get_by_id(self, id_maladie: int) -> Optional[models.Maladie]:
         """Retrieve a maladie by its ID"""
         return self.db_session.query(models.Maladie).filter(models.Maladie.id == id_maladie).first()
 
+    def get_by_ids(self, ids: List[int]) -> List[Optional[models.Maladie]]:
+        """Retrieve maladies by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(models.Maladie), models.Maladie.id, ids)
+
     def get_all(self) -> List[models.Maladie]:
         """Retrieve all maladies"""
         return self.db_session.query(models.Maladie).all()
 
+    def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, **filters) -> Tuple[List[models.Maladie], Optional[str]]:
+        """Retrieve a page of maladies ordered by ID, optionally filtered"""
+        query = apply_filters(self.db_session.query(models.Maladie), models.Maladie, filters)
+        return paginate(query, [models.Maladie.id], limit, cursor)
+
     def update(self, id_maladie: int, **kwargs) -> Optional[models.Maladie]:
         """Update an existing maladie"""
         maladie = self.get_by_id(id_maladie)
@@ -35,6 +56,7 @@ class MaladieRepository:
                 if key in allowed_fields and value is not None:
                     setattr(maladie, key, value)
             self.db_session.commit()
+            response_cache.invalidate("maladie")
             self.db_session.refresh(maladie)
         return maladie
 
@@ -44,5 +66,6 @@ class MaladieRepository:
         if maladie:
             self.db_session.delete(maladie)
             self.db_session.commit()
+            response_cache.invalidate("maladie")
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+RANGE_SUFFIXES = {
+    "_min": lambda column, value: column >= value,
+    "_max": lambda column, value: column <= value,
+}
+
+def encode_cursor(values):
+    """Build an opaque cursor from the key values of the last item of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor, size):
+    """Decode a cursor built by encode_cursor, raises ValueError if malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+def check_cursor_values(values, key_columns):
+    """Check that decoded cursor values have the Python type of their key column, raises ValueError otherwise"""
+    for value, column in zip(values, key_columns):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        # bool is an int for isinstance, but never a valid key
+        if isinstance(value, bool) or not isinstance(value, python_type):
+            raise ValueError("Invalid cursor")
+    return values
+
+def apply_filters(query, model, filters):
+    """Apply equality filters, or range filters for names ending in _min/_max"""
+    for name, value in filters.items():
+        if value is None:
+            continue
+        for suffix, compare in RANGE_SUFFIXES.items():
+            if name.endswith(suffix):
+                query = query.filter(compare(getattr(model, name[:-len(suffix)]), value))
+                break
+        else:
+            query = query.filter(getattr(model, name) == value)
+    return query
+
+def paginate(query, key_columns, limit=None, cursor=None):
+    """Keyset pagination on key_columns, returns (items, next_cursor)"""
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    if cursor:
+        values = check_cursor_values(decode_cursor(cursor, len(key_columns)), key_columns)
+        if len(key_columns) == 1:
+            query = query.filter(key_columns[0] > values[0])
+        else:
+            query = query.filter(tuple_(*key_columns) > tuple_(*values))
+
+    # Fetch one extra row to know whether another page exists
+    items = query.order_by(*key_columns).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in key_columns])
+    return items, next_cursor
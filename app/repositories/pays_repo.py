@@ -1,4 +1,9 @@
-from app.models import Pays
+from app.models import Continent, Pays
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.repositories.expand import load_expanded, with_expand
+from app.cache import response_cache
 
 class PaysRepository:
     """Repository for managing Pays data"""
@@ -10,13 +15,33 @@ class PaysRepository:
         """Retrieve all countries"""
         return self.db_session.query(Pays).all()
 
-    def get_by_id(self, id):
+    def get_page(self, limit=None, cursor=None, expand=None, **filters):
+        """Retrieve a page of countries ordered by ID, optionally filtered, with the expanded relations loaded"""
+        query = apply_filters(with_expand(self.db_session.query(Pays), Pays, expand), Pays, filters)
+        pays, next_cursor = paginate(query, [Pays.id], limit, cursor)
+        return load_expanded(self.db_session, pays, Pays, expand), next_cursor
+
+    def get_by_id(self, id, expand=None):
         """Retrieve a country by its ID"""
-        return self.db_session.query(Pays).filter_by(id=id).first()
+        pays = with_expand(self.db_session.query(Pays), Pays, expand).filter_by(id=id).first()
+        if pays:
+            load_expanded(self.db_session, [pays], Pays, expand)
+        return pays
+
+    def get_by_ids(self, ids):
+        """Retrieve countries by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Pays), Pays.id, ids)
 
-    def get_by_code(self, code_pays):
+    def get_by_code(self, code_pays, expand=None):
         """Retrieve a country by its code"""
-        return self.db_session.query(Pays).filter_by(code_pays=code_pays).first()
+        pays = with_expand(self.db_session.query(Pays), Pays, expand).filter_by(code_pays=code_pays).first()
+        if pays:
+            load_expanded(self.db_session, [pays], Pays, expand)
+        return pays
+
+    def get_by_codes(self, codes):
+        """Retrieve countries by their codes in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Pays), Pays.code_pays, codes)
 
     def get_by_continent(self, code_continent):
         """Retrieve countries by continent code"""
@@ -33,9 +58,17 @@ class PaysRepository:
         )
         self.db_session.add(new_pays)
         self.db_session.commit()
+        response_cache.invalidate("pays")
         self.db_session.refresh(new_pays)
         return new_pays
 
+    def bulk_upsert(self, items):
+        """Create or update countries by code_pays in one statement, returns (rows, errors)"""
+        stored, errors = bulk_upsert(self.db_session, Pays, items, key=["code_pays"], references={"code_continent": Continent.code_continent})
+        if stored:
+            response_cache.invalidate("pays")
+        return stored, errors
+
     def update(self, id, **data):
         """Update an existing country"""
         pays = self.get_by_id(id)
@@ -49,6 +82,7 @@ class PaysRepository:
                 setattr(pays, key, value)
 
         self.db_session.commit()
+        response_cache.invalidate("pays")
         return pays
 
     def delete(self, id):
@@ -58,4 +92,5 @@ class PaysRepository:
             return False
         self.db_session.delete(pays)
         self.db_session.commit()
+        response_cache.invalidate("pays")
         return True
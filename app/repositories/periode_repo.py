@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app import models
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.cache import response_cache
 
 class PeriodeRepository:
     """Repository for managing Periode data"""
@@ -13,17 +17,34 @@ class PeriodeRepository:
         periode = models.Periode(**kwargs)
         self.db_session.add(periode)
         self.db_session.commit()
+        response_cache.invalidate("periode")
         self.db_session.refresh(periode)
         return periode
 
+    def bulk_upsert(self, items: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Create or update periodes by nom in one statement, returns (rows, errors)"""
+        stored, errors = bulk_upsert(self.db_session, models.Periode, items, key=["nom"])
+        if stored:
+            response_cache.invalidate("periode")
+        return stored, errors
+
     def get_by_id(self, id_periode: int) -> Optional[models.Periode]:
         """Retrieve a periode by its ID"""
         return self.db_session.query(models.Periode).filter(models.Periode.id == id_periode).first()
 
+    def get_by_ids(self, ids: List[int]) -> List[Optional[models.Periode]]:
+        """Retrieve periodes by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(models.Periode), models.Periode.id, ids)
+
     def get_all(self) -> List[models.Periode]:
         """Retrieve all periodes"""
         return self.db_session.query(models.Periode).all()
 
+    def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, **filters) -> Tuple[List[models.Periode], Optional[str]]:
+        """Retrieve a page of periodes ordered by ID, optionally filtered"""
+        query = apply_filters(self.db_session.query(models.Periode), models.Periode, filters)
+        return paginate(query, [models.Periode.id], limit, cursor)
+
     def update(self, id_periode: int, **kwargs) -> Optional[models.Periode]:
         """Update an existing periode"""
         periode = self.get_by_id(id_periode)
@@ -33,6 +54,7 @@ class PeriodeRepository:
                 if key in allowed_fields and value is not None:
                     setattr(periode, key, value)
             self.db_session.commit()
+            response_cache.invalidate("periode")
             self.db_session.refresh(periode)
         return periode
 
@@ -42,5 +64,6 @@ class PeriodeRepository:
         if periode:
             self.db_session.delete(periode)
             self.db_session.commit()
+            response_cache.invalidate("periode")
             return True
         return False
\ No newline at end of file
@@ -1,8 +1,17 @@
 from app.models.rapport import Rapport
 from app.db import db
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from app import models
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.repositories.expand import with_expand
+
+AGGREGATE_BUCKETS = ("day", "week", "month", "year")
+RAPPORT_DIMENSIONS = {"maladie": "code_maladie", "periode": "code_periode"}
+CONCERNE_DIMENSIONS = {"pays": "code_pays", "region": "code_region", "continent": "code_continent"}
 
 class RapportRepository:
     """Repository for managing Rapport data"""
@@ -18,14 +27,29 @@ class RapportRepository:
         self.db_session.refresh(rapport)
         return rapport
 
-    def get_by_id(self, code_rapport: int) -> Optional[models.Rapport]:
+    def bulk_upsert(self, items: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Create rapports in one statement (rapports have no natural key to upsert on), returns (rows, errors)"""
+        return bulk_upsert(self.db_session, models.Rapport, items, references={"code_maladie": models.Maladie.id, "code_periode": models.Periode.id})
+
+    def get_by_id(self, code_rapport: int, expand: Optional[List[str]] = None) -> Optional[models.Rapport]:
         """Retrieve a rapport by its ID"""
-        return self.db_session.query(models.Rapport).filter(models.Rapport.id == code_rapport).first()
+        query = with_expand(self.db_session.query(models.Rapport), models.Rapport, expand)
+        return query.filter(models.Rapport.id == code_rapport).first()
+
+    def get_by_ids(self, ids: List[int]) -> List[Optional[models.Rapport]]:
+        """Retrieve rapports by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(models.Rapport), models.Rapport.id, ids)
 
     def get_all(self) -> List[models.Rapport]:
         """Retrieve all rapports"""
         return self.db_session.query(models.Rapport).all()
 
+    def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, expand: Optional[List[str]] = None, **filters) -> Tuple[List[models.Rapport], Optional[str]]:
+        """Retrieve a page of rapports ordered by ID, optionally filtered, with the expanded relations loaded"""
+        query = with_expand(self.db_session.query(models.Rapport), models.Rapport, expand)
+        query = apply_filters(query, models.Rapport, filters)
+        return paginate(query, [models.Rapport.id], limit, cursor)
+
     def update(self, code_rapport: int, **kwargs) -> Optional[models.Rapport]:
         """Update an existing rapport"""
         rapport = self.get_by_id(code_rapport)
@@ -49,4 +73,55 @@ class RapportRepository:
             self.db_session.delete(rapport)
             self.db_session.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def aggregate(self, bucket: str = "month", group_by: Optional[List[str]] = None,
+                  date_debut_min=None, date_debut_max=None) -> List[Dict]:
+        """Sum new cases and deaths per time bucket of date_debut, in a single GROUP BY"""
+        if bucket not in AGGREGATE_BUCKETS:
+            raise ValueError(f"Invalid bucket '{bucket}'")
+        group_by = group_by or []
+        unknown = set(group_by) - set(RAPPORT_DIMENSIONS) - set(CONCERNE_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Invalid group_by dimension(s): {', '.join(sorted(unknown))}")
+
+        Rapport = models.Rapport
+        # bucket is whitelisted above; inlined so that SELECT and GROUP BY share the same expression
+        bucket_column = func.date_trunc(literal_column(f"'{bucket}'"), Rapport.date_debut).label("bucket")
+        dimensions = [getattr(Rapport, RAPPORT_DIMENSIONS[name]).label(name)
+                      for name in group_by if name in RAPPORT_DIMENSIONS]
+
+        filters = []
+        if date_debut_min is not None:
+            filters.append(Rapport.date_debut >= date_debut_min)
+        if date_debut_max is not None:
+            filters.append(Rapport.date_debut <= date_debut_max)
+
+        # Geographic dimensions come from concerne; distinct pairs so that a rapport
+        # linked to several regions of one country is only counted once per country.
+        # Over a period, the distinct pairs are read per rapport of the period (LATERAL,
+        # through the code_rapport index) instead of over the whole concerne table.
+        geo = [name for name in group_by if name in CONCERNE_DIMENSIONS]
+        concerne = None
+        if geo:
+            concerne = select(
+                models.Concerne.code_rapport,
+                *[getattr(models.Concerne, CONCERNE_DIMENSIONS[name]).label(name) for name in geo]
+            ).distinct()
+            if filters:
+                concerne = concerne.where(models.Concerne.code_rapport == Rapport.id).lateral()
+            else:
+                concerne = concerne.subquery()
+            dimensions += [concerne.c[name] for name in geo]
+
+        query = select(
+            bucket_column,
+            *dimensions,
+            func.sum(Rapport.nouveaux_cas).label("nouveaux_cas"),
+            func.sum(Rapport.nouveaux_deces).label("nouveaux_deces"),
+        ).select_from(Rapport)
+        if concerne is not None:
+            query = query.join(concerne, concerne.c.code_rapport == Rapport.id)
+
+        query = query.where(*filters).group_by(bucket_column, *dimensions).order_by(bucket_column, *dimensions)
+        return [dict(row._mapping) for row in self.db_session.execute(query)]
@@ -1,4 +1,9 @@
+from app.models import Pays
 from app.models.region import Region
+from app.repositories.pagination import apply_filters, paginate
+from app.repositories.bulk import bulk_upsert
+from app.repositories.lookup import get_many
+from app.cache import response_cache
 
 class RegionRepository:
     """Repository for managing Region data"""
@@ -10,14 +15,27 @@ class RegionRepository:
         """Retrieve all regions"""
         return self.db_session.query(Region).all()
 
+    def get_page(self, limit=None, cursor=None, **filters):
+        """Retrieve a page of regions ordered by ID, optionally filtered"""
+        query = apply_filters(self.db_session.query(Region), Region, filters)
+        return paginate(query, [Region.id], limit, cursor)
+
     def get_by_id(self, id):
         """Retrieve a region by its ID"""
         return self.db_session.query(Region).filter_by(id=id).first()
 
+    def get_by_ids(self, ids):
+        """Retrieve regions by their IDs in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Region), Region.id, ids)
+
     def get_by_code(self, code_region):
         """Retrieve a region by its code"""
         return self.db_session.query(Region).filter_by(code_region=code_region).first()
 
+    def get_by_codes(self, codes):
+        """Retrieve regions by their codes in one query, in request order (None if missing)"""
+        return get_many(self.db_session.query(Region), Region.code_region, codes)
+
     def get_by_pays(self, code_pays):
         """Retrieve regions by country code"""
         return self.db_session.query(Region).filter_by(code_pays=code_pays).all()
@@ -27,9 +45,17 @@ class RegionRepository:
         new_region = Region(code_region=code_region, nom=nom, code_pays=code_pays)
         self.db_session.add(new_region)
         self.db_session.commit()
+        response_cache.invalidate("region")
         self.db_session.refresh(new_region)
         return new_region
 
+    def bulk_upsert(self, items):
+        """Create or update regions by code_region in one statement, returns (rows, errors)"""
+        stored, errors = bulk_upsert(self.db_session, Region, items, key=["code_region"], references={"code_pays": Pays.code_pays})
+        if stored:
+            response_cache.invalidate("region")
+        return stored, errors
+
     def update(self, id, **data):
         """Update an existing region"""
         region = self.get_by_id(id)
@@ -43,6 +69,7 @@ class RegionRepository:
                 setattr(region, key, value)
 
         self.db_session.commit()
+        response_cache.invalidate("region")
         return region
 
     def delete(self, id):
@@ -52,4 +79,5 @@ class RegionRepository:
             return False
         self.db_session.delete(region)
         self.db_session.commit()
+        response_cache.invalidate("region")
         return True
\ No newline at end of file
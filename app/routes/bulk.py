@@ -0,0 +1,23 @@
+from flask import request
+from flask_restx import fields
+from app.repositories.bulk import MAX_BULK_ITEMS
+
+def bulk_result_model(namespace, item_model):
+    """Response model of a bulk endpoint: the stored items and the rejected ones"""
+    error_model = namespace.model("BulkError", {
+        "index": fields.Integer(description="Position of the item in the request"),
+        "error": fields.String(description="Why the item was rejected"),
+    })
+    return namespace.model(f"{item_model.name}BulkResult", {
+        "items": fields.List(fields.Nested(item_model), description="Stored items, in request order"),
+        "errors": fields.List(fields.Nested(error_model), description="Rejected items"),
+    })
+
+def bulk_items(namespace):
+    """JSON array body of a bulk request, aborts with 400 if it is not one"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        namespace.abort(400, "Body must be a JSON array")
+    if len(items) > MAX_BULK_ITEMS:
+        namespace.abort(400, f"At most {MAX_BULK_ITEMS} items per request")
+    return items
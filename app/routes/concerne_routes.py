@@ -2,6 +2,13 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.concerne_repo import ConcerneRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.expand import add_expand_argument, expanded_model, marshal_expanded, parse_expand
+from app.routes.continent_routes import continent_model
+from app.routes.pays_routes import pays_model
+from app.routes.region_routes import region_model
+from app.routes.rapport_routes import rapport_model
 
 # Define Namespace
 concerne_api = Namespace("concerne", description="Concerne related operations")
@@ -21,15 +28,38 @@ concerne_create_model = concerne_api.model("ConcerneCreate", {
     "code_rapport": fields.Integer(required=True, description="Rapport ID"),
 })
 
+concerne_bulk_model = bulk_result_model(concerne_api, concerne_model)
+
+# Relations that can be embedded with ?expand=continent,pays,region,rapport
+concerne_relations = {
+    "continent": fields.Nested(continent_model, allow_null=True, description="Continent"),
+    "pays": fields.Nested(pays_model, allow_null=True, description="Country"),
+    "region": fields.Nested(region_model, allow_null=True, description="Region"),
+    "rapport": fields.Nested(rapport_model, allow_null=True, description="Rapport"),
+}
+concerne_expanded_model = expanded_model(concerne_api, concerne_model, concerne_relations)
+
+concerne_list_parser = add_expand_argument(
+    list_parser({"code_continent": str, "code_pays": str, "code_region": str, "code_rapport": int}),
+    concerne_relations,
+)
+
 @concerne_api.route("/")
 class ConcerneList(Resource):
     """Handles listing and creating concerne entries"""
 
-    @concerne_api.marshal_list_with(concerne_model)
+    @concerne_api.expect(concerne_list_parser)
+    @concerne_api.response(200, "Success", [concerne_expanded_model])
     def get(self):
-        """Get all concerne entries"""
+        """Get concerne entries, paginated (next page in the Link header), with ?expand=continent,pays,region,rapport embedded"""
+        args = concerne_list_parser.parse_args()
+        expand = parse_expand(concerne_api, args.pop("expand"), concerne_relations)
         repo = ConcerneRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            concernes, next_cursor = repo.get_page(expand=expand, **args)
+        except ValueError as e:
+            concerne_api.abort(400, str(e))
+        return marshal_expanded(concernes, concerne_model, concerne_relations, expand), 200, next_page_headers(next_cursor)
 
     @concerne_api.expect(concerne_create_model)
     @concerne_api.marshal_with(concerne_model, code=201)
@@ -40,6 +70,20 @@ class ConcerneList(Resource):
         return repo.create(**data), 201
 
 
+@concerne_api.route("/bulk")
+class ConcerneBulk(Resource):
+    """Handles creating many concerne entries at once"""
+
+    @concerne_api.expect([concerne_create_model])
+    @concerne_api.marshal_with(concerne_bulk_model)
+    def post(self):
+        """Create concerne entries from a JSON array, in one statement (existing entries are kept)"""
+        items = bulk_items(concerne_api)
+        repo = ConcerneRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
 @concerne_api.route("/<string:code_continent>/<string:code_pays>/<string:code_region>/<int:code_rapport>")
 class ConcerneResource(Resource):
     """Handles operations on a single concerne entry"""
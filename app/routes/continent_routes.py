@@ -2,6 +2,10 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.continent_repo import ContinentRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.cache import cached
 
 # Define Namespace
 continent_api = Namespace("continent", description="Continent related operations")
@@ -18,15 +22,28 @@ continent_create_model = continent_api.model("ContinentCreate", {
     "nom": fields.String(required=True, description="Continent Name"),
 })
 
+continent_bulk_model = bulk_result_model(continent_api, continent_model)
+continent_lookup_model = lookup_result_model(continent_api, continent_model)
+continent_lookup_parser = lookup_parser(codes=True)
+
+continent_list_parser = list_parser({"code_continent": str})
+
 @continent_api.route("/")
 class ContinentList(Resource):
     """Handles listing and creating continents"""
 
+    @cached("continent")
+    @continent_api.expect(continent_list_parser)
     @continent_api.marshal_list_with(continent_model)
     def get(self):
-        """Get all continents"""
+        """Get continents, paginated (next page in the Link header)"""
+        args = continent_list_parser.parse_args()
         repo = ContinentRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            continents, next_cursor = repo.get_page(**args)
+        except ValueError as e:
+            continent_api.abort(400, str(e))
+        return continents, 200, next_page_headers(next_cursor)
 
     @continent_api.expect(continent_create_model)
     @continent_api.marshal_with(continent_model, code=201)
@@ -37,10 +54,40 @@ class ContinentList(Resource):
         return repo.create(**data), 201
 
 
+@continent_api.route("/bulk")
+class ContinentBulk(Resource):
+    """Handles creating or updating many continents at once"""
+
+    @continent_api.expect([continent_create_model])
+    @continent_api.marshal_with(continent_bulk_model)
+    def post(self):
+        """Create or update continents by code_continent from a JSON array, in one statement"""
+        items = bulk_items(continent_api)
+        repo = ContinentRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@continent_api.route("/batch")
+class ContinentBatch(Resource):
+    """Handles looking up many continents at once"""
+
+    @cached("continent")
+    @continent_api.expect(continent_lookup_parser)
+    @continent_api.marshal_with(continent_lookup_model)
+    def get(self):
+        """Get continents by ?ids=1,2,3 or ?codes=EU,AF with one query, in request order"""
+        field, values = lookup_values(continent_api, continent_lookup_parser.parse_args())
+        repo = ContinentRepository(db.session)
+        items = repo.get_by_ids(values) if field == "ids" else repo.get_by_codes(values)
+        return lookup_result(values, items)
+
+
 @continent_api.route("/<int:id_continent>")
 class ContinentResource(Resource):
     """Handles operations on a single continent"""
 
+    @cached("continent")
     @continent_api.marshal_with(continent_model)
     def get(self, id_continent):
         """Get a continent by its ID"""
@@ -73,6 +120,7 @@ class ContinentResource(Resource):
 class ContinentByCode(Resource):
     """Handles getting a continent by its code"""
 
+    @cached("continent")
     @continent_api.marshal_with(continent_model)
     def get(self, code_continent):
         """Get a continent by its code"""
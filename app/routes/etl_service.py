@@ -1,14 +1,45 @@
 from flask import request
 from flask_restx import Namespace, Resource
 import pandas as pd
-from app.etl.components.transform import transform_data
-from app.etl.components.mongodb import insert_data, get_collection_infos
-from app.etl.main import get_url, download_csv
+from app.etl.components.transform import transform_file
+from app.etl.components.mongodb import insert_chunks, get_collection_infos, get_collection_names, get_index_stats, ensure_indexes
+from app.etl.main import get_url
+from app.etl.components.extract import download_csv
+from app.etl.jobs import job_manager, JobQueueFull
 from config import Config
-import io
+import os
+import tempfile
 
 etl_ns = Namespace('etl', description='ETL operations')
 
+def ingest_file(job, path, collection, source=None):
+    """Job: read, transform and insert a CSV file chunk by chunk, then remove it.
+    source identifies the file (URL, uploaded file name) for the schema cache, the temporary path otherwise."""
+    try:
+        # Read, transform and insert chunk by chunk to keep memory bounded; the column schema
+        # is read from the whole file first, so every chunk gets the same columns and types
+        read_chunks = lambda: pd.read_csv(path, encoding='utf-8', chunksize=Config.ETL_CHUNK_SIZE)
+        transformed = transform_file(read_chunks, source=source or path)
+        inserted = insert_chunks(transformed, collection, progress=job.progress)
+    finally:
+        os.remove(path)
+    if not inserted:
+        raise ValueError('No data after transformation')
+    return inserted
+
+def ingest_url(job, url, collection):
+    """Job: stream a remote CSV file to disk, then ingest it chunk by chunk"""
+    path = download_csv(url)
+    job.keep_file(path)
+    return ingest_file(job, path, collection, source=url)
+
+def job_accepted(job):
+    return {
+        'message': 'Job accepted',
+        'job_id': job.id,
+        'status_url': f'/api/etl/jobs/{job.id}',
+    }, 202, {'Location': f'/api/etl/jobs/{job.id}'}
+
 @etl_ns.route('/upload')
 class FileUpload(Resource):
     def post(self):
@@ -21,16 +52,20 @@ class FileUpload(Resource):
         if file.filename == '':
             return {'message': 'No selected file'}, 400
 
+        path = None
         try:
-            df = pd.read_csv(io.StringIO(file.read().decode('utf-8')))
-            transformed = transform_data(df)
-
-            if transformed.empty:
-                return {'message': 'No data after transformation'}, 400
-
-            insert_data(transformed, title)
-            return {'message': 'File uploaded and processed successfully'}, 200
+            # The request stream is gone once we return: keep the upload on disk for the job
+            fd, path = tempfile.mkstemp(suffix='.csv', prefix='etl-upload-')
+            with os.fdopen(fd, 'wb') as tmp:
+                file.save(tmp)
+            job = job_manager.submit('upload', title, ingest_file, path, title, file.filename, temp_path=path)
+            return job_accepted(job)
+        except JobQueueFull as e:
+            os.remove(path)
+            return {'message': f'Too many ETL jobs, retry later: {str(e)}'}, 503
         except Exception as e:
+            if path and os.path.exists(path):
+                os.remove(path)
             return {'message': f'Error processing file: {str(e)}'}, 500
 
 @etl_ns.route('/download')
@@ -39,29 +74,63 @@ class FileDownload(Resource):
         code = request.json.get('code')
         if not code:
             return {'message': 'Code is required'}, 400
-        
+
+        url = get_url(code)
+        if not url:
+            return {'message': f"Unknown code '{code}'"}, 404
+
         try:
-            url = get_url(code)
-            if not url:
-                exit()
-            csv_content = download_csv(url)
-            raw_data = pd.read_csv(io.StringIO(csv_content))
-            transformed = transform_data(raw_data)
+            job = job_manager.submit('download', "TESTURLE", ingest_url, url, "TESTURLE")
+            return job_accepted(job)
+        except JobQueueFull as e:
+            return {'message': f'Too many ETL jobs, retry later: {str(e)}'}, 503
 
-            if transformed.empty:
-                return {'message': 'No data after transformation'}, 400
+@etl_ns.route('/jobs')
+class JobList(Resource):
+    def get(self):
+        """List recent ETL jobs"""
+        return {'jobs': job_manager.list()}, 200
 
-            insert_data(transformed, "TESTURLE")
-            return {'message': 'File uploaded and processed successfully'}, 200
-        except Exception as e:
-            return {'message': f'Error processing file: {str(e)}'}, 500
+@etl_ns.route('/jobs/<string:job_id>')
+class JobStatus(Resource):
+    def get(self, job_id):
+        """State, rows processed, throughput and error of an ETL job"""
+        job = job_manager.get(job_id)
+        if not job:
+            return {'message': 'Job not found'}, 404
+        return job, 200
 
 @etl_ns.route('/collections')
 class GetCollections(Resource):
     def get(self):
+        # exact=true recounts every document instead of using the cached estimates
+        exact = request.args.get('exact', 'false').lower() == 'true'
         try:
-            collections = get_collection_infos()
-            return {'collections': collections, 'message': 'Collections fetched successfully'}, 200
+            collections = get_collection_infos(exact=exact)
         except Exception as e:
             return {'message': f'Error fetching collections: {str(e)}'}, 500
-        
\ No newline at end of file
+        # A collection whose statistics failed is listed with its error
+        if any('error' in collection for collection in collections):
+            return {'collections': collections, 'message': 'Some collections could not be read'}, 200
+        return {'collections': collections, 'message': 'Collections fetched successfully'}, 200
+
+@etl_ns.route('/collections/<string:collection>/indexes')
+class CollectionIndexes(Resource):
+    def get(self, collection):
+        """List the indexes of a collection with their size and usage"""
+        if collection not in get_collection_names():
+            return {'message': f"Collection '{collection}' not found"}, 404
+        try:
+            return {'collection': collection, 'indexes': get_index_stats(collection)}, 200
+        except Exception as e:
+            return {'message': f'Error fetching indexes: {str(e)}'}, 500
+
+    def post(self, collection):
+        """Build the declared indexes of a collection now"""
+        if collection not in get_collection_names():
+            return {'message': f"Collection '{collection}' not found"}, 404
+        try:
+            ensure_indexes(collection, background=False)
+            return {'collection': collection, 'indexes': get_index_stats(collection)}, 200
+        except Exception as e:
+            return {'message': f'Error creating indexes: {str(e)}'}, 500
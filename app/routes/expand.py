@@ -0,0 +1,26 @@
+from flask_restx import marshal, reqparse
+
+def add_expand_argument(parser, relations):
+    """Add the expand argument (comma separated relationship names) to a parser"""
+    parser.add_argument("expand", type=str, required=False,
+                        help=f"Comma separated relations to embed: {', '.join(relations)}")
+    return parser
+
+def expand_parser(relations):
+    return add_expand_argument(reqparse.RequestParser(), relations)
+
+def parse_expand(namespace, value, relations):
+    """Requested relation names, aborts with 400 on unknown ones"""
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in relations]
+    if unknown:
+        namespace.abort(400, f"Cannot expand {', '.join(unknown)} (expandable: {', '.join(relations)})")
+    return names
+
+def expanded_model(namespace, model, relations):
+    """Documentation model of a resource with every expandable relation embedded"""
+    return namespace.clone(f"{model.name}Expanded", model, relations)
+
+def marshal_expanded(data, model, relations, expand):
+    """Marshal with the model plus only the requested relations, so others are never loaded"""
+    return marshal(data, dict(model, **{name: relations[name] for name in expand}))
@@ -1,5 +1,7 @@
-from flask_restx import Namespace, Resource, reqparse
-from app.etl.components.mongodb import fetch_data
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource, reqparse, inputs
+from app.etl.components.mongodb import fetch_data, fetch_data_after, stream_data, stream_data_after
+from pymongo import errors
 from config import Config
 from datetime import datetime
 import json
@@ -13,6 +15,8 @@ parser.add_argument("start_date", type=str, required=False, help="Start date (YY
 parser.add_argument("end_date", type=str, required=False, help="End date (YYYY-MM-DD)")
 parser.add_argument("page", type=int, default=1, help="Page number")
 parser.add_argument("page_size", type=int, default=1000, help="Number of documents per page")
+parser.add_argument("cursor", type=str, required=False, help="Keyset pagination cursor (empty for the first page, then the returned next_cursor); takes precedence over page")
+parser.add_argument("stream", type=inputs.boolean, default=False, help="Stream the page as a chunked JSON array (send Accept: application/x-ndjson for NDJSON); with a cursor, the next one is sent in the X-Next-Cursor header")
 
 @filtered_data_ns.route("/")
 class FilteredData(Resource):
@@ -24,6 +28,11 @@ class FilteredData(Resource):
         end_date = args.get("end_date")
         page = args.get("page")
         page_size = args.get("page_size")
+        cursor = args.get("cursor")
+        ndjson = request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson"
+        stream = args.get("stream") or ndjson
+        if page_size <= 0:
+            return {"error": "page_size must be a positive integer."}, 400
         skip = (page - 1) * page_size
         
         # Build the MongoDB filter
@@ -47,9 +56,31 @@ class FilteredData(Resource):
         if date_filter:
             query['date'] = date_filter
         
-        # Fetch data
+        mimetype = "application/x-ndjson" if ndjson else "application/json"
+
+        # Keyset pagination: resume right after the last document of the previous page
+        if cursor is not None:
+            try:
+                if stream:
+                    chunks, next_cursor = stream_data_after("TESTURLE", query, cursor=cursor, limit=page_size, ndjson=ndjson)
+                    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+                    return Response(stream_with_context(chunks), status=200, mimetype=mimetype, headers=headers)
+                data, next_cursor = fetch_data_after("TESTURLE", query, cursor=cursor, limit=page_size)
+                body = '{"data": %s, "next_cursor": %s}' % (data, json.dumps(next_cursor))
+                return Response(body, status=200, mimetype="application/json")
+            except ValueError:
+                return {"error": "Invalid cursor."}, 400
+            except errors.PyMongoError as e:
+                return {"error": str(e)}, 500
+
+        # Streaming: documents are encoded as they come out of the Mongo cursor
+        if stream:
+            chunks = stream_data("TESTURLE", query, skip=skip, limit=page_size, ndjson=ndjson)
+            return Response(stream_with_context(chunks), status=200, mimetype=mimetype)
+
+        # Fetch data (already serialized, sent as is)
         try:
             data = fetch_data("TESTURLE", query, skip=skip, limit=page_size)
-            return json.loads(data), 200
+            return Response(data, status=200, mimetype="application/json")
         except Exception as e:
             return {"error": str(e)}, 500
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from app.db import db
 from sqlalchemy.sql import text
+from app.cache import response_cache
 
 # Define Namespace (NO Blueprint anymore)
 health_api = Namespace("health", description="Health check related operations")
@@ -15,6 +16,17 @@ db_check_model = health_api.model("DBCheck", {
     "message": fields.String(description="Error message")
 })
 
+cache_stats_model = health_api.model("CacheStats", {
+    "hits": fields.Integer(description="Responses served from the cache"),
+    "misses": fields.Integer(description="Responses built from the database"),
+    "not_modified": fields.Integer(description="304 answers to If-None-Match"),
+    "evictions": fields.Integer(description="Entries evicted to stay under max_bytes"),
+    "entries": fields.Integer(description="Cached responses"),
+    "bytes": fields.Integer(description="Size of the cached responses"),
+    "max_bytes": fields.Integer(description="Cache size limit"),
+    "ttl": fields.Integer(description="Seconds a cached response is served (null: no expiry)"),
+})
+
 @health_api.route("/status")
 class HealthCheck(Resource):
     @health_api.marshal_with(health_model)
@@ -32,3 +44,10 @@ class DBCheck(Resource):
             return {"database": "Connected"}, 200
         except Exception as e:
             return {"database": "Error", "message": str(e)}, 500
+
+@health_api.route("/cache")
+class CacheStats(Resource):
+    @health_api.marshal_with(cache_stats_model)
+    def get(self):
+        """Reference-data response cache counters."""
+        return response_cache.stats(), 200
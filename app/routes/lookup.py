@@ -0,0 +1,36 @@
+from flask_restx import fields, reqparse
+from app.repositories.lookup import MAX_LOOKUP_VALUES
+
+def lookup_parser(codes=True):
+    """Query string parser of a batch lookup endpoint (?ids=1,2,3 or ?codes=FR,DE)"""
+    parser = reqparse.RequestParser()
+    parser.add_argument("ids", type=str, required=False, help=f"Comma separated IDs (max {MAX_LOOKUP_VALUES})")
+    if codes:
+        parser.add_argument("codes", type=str, required=False, help=f"Comma separated codes (max {MAX_LOOKUP_VALUES})")
+    return parser
+
+def lookup_values(namespace, args):
+    """Requested (field, values) of a batch lookup, aborts with 400 if invalid"""
+    given = {name: value for name, value in args.items() if value}
+    if len(given) != 1:
+        namespace.abort(400, f"Give exactly one of: {', '.join(args)}")
+    name, raw = given.popitem()
+    values = [value.strip() for value in raw.split(",") if value.strip()]
+    if len(values) > MAX_LOOKUP_VALUES:
+        namespace.abort(400, f"At most {MAX_LOOKUP_VALUES} values per request")
+    if name == "ids":
+        try:
+            values = [int(value) for value in values]
+        except ValueError:
+            namespace.abort(400, "ids must be integers")
+    return name, values
+
+def lookup_result_model(namespace, item_model):
+    """Response model of a batch lookup: one item (or null) per requested value, and the misses"""
+    return namespace.model(f"{item_model.name}Lookup", {
+        "items": fields.List(fields.Nested(item_model, allow_null=True), description="One item per requested value, in request order (null if missing)"),
+        "missing": fields.List(fields.Raw, description="Requested values that were not found"),
+    })
+
+def lookup_result(values, items):
+    return {"items": items, "missing": [value for value, item in zip(values, items) if item is None]}
@@ -2,6 +2,10 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.maladie_repo import MaladieRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.cache import cached
 
 # Define Namespace
 maladie_api = Namespace("maladie", description="Maladie related operations")
@@ -16,15 +20,28 @@ maladie_create_model = maladie_api.model("MaladieCreate", {
     "nom": fields.String(required=True, description="Maladie Name"),
 })
 
+maladie_bulk_model = bulk_result_model(maladie_api, maladie_model)
+maladie_lookup_model = lookup_result_model(maladie_api, maladie_model)
+maladie_lookup_parser = lookup_parser(codes=False)
+
+maladie_list_parser = list_parser({"nom": str})
+
 @maladie_api.route("/")
 class MaladieList(Resource):
     """Handles listing and creating maladies"""
 
+    @cached("maladie")
+    @maladie_api.expect(maladie_list_parser)
     @maladie_api.marshal_list_with(maladie_model)
     def get(self):
-        """Get all maladies"""
+        """Get maladies, paginated (next page in the Link header)"""
+        args = maladie_list_parser.parse_args()
         repo = MaladieRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            maladies, next_cursor = repo.get_page(**args)
+        except ValueError as e:
+            maladie_api.abort(400, str(e))
+        return maladies, 200, next_page_headers(next_cursor)
 
     @maladie_api.expect(maladie_create_model)
     @maladie_api.marshal_with(maladie_model, code=201)
@@ -35,10 +52,40 @@ class MaladieList(Resource):
         return repo.create(**data), 201
 
 
+@maladie_api.route("/bulk")
+class MaladieBulk(Resource):
+    """Handles creating or updating many maladies at once"""
+
+    @maladie_api.expect([maladie_create_model])
+    @maladie_api.marshal_with(maladie_bulk_model)
+    def post(self):
+        """Create or update maladies by nom from a JSON array, in one statement"""
+        items = bulk_items(maladie_api)
+        repo = MaladieRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@maladie_api.route("/batch")
+class MaladieBatch(Resource):
+    """Handles looking up many maladies at once"""
+
+    @cached("maladie")
+    @maladie_api.expect(maladie_lookup_parser)
+    @maladie_api.marshal_with(maladie_lookup_model)
+    def get(self):
+        """Get maladies by ?ids=1,2,3 with one query, in request order"""
+        _, values = lookup_values(maladie_api, maladie_lookup_parser.parse_args())
+        repo = MaladieRepository(db.session)
+        items = repo.get_by_ids(values)
+        return lookup_result(values, items)
+
+
 @maladie_api.route("/<int:id_maladie>")
 class MaladieResource(Resource):
     """Handles operations on a single maladie"""
 
+    @cached("maladie")
     @maladie_api.marshal_with(maladie_model)
     def get(self, id_maladie):
         """Get a maladie by its ID"""
@@ -0,0 +1,25 @@
+from urllib.parse import urlencode
+from flask import request
+from flask_restx import reqparse
+from app.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+def list_parser(filters=None, range_filters=None):
+    """Build the query string parser of a paginated list endpoint"""
+    parser = reqparse.RequestParser()
+    parser.add_argument("limit", type=int, default=DEFAULT_PAGE_SIZE, help=f"Page size (max {MAX_PAGE_SIZE})")
+    parser.add_argument("cursor", type=str, required=False, help="Cursor of the next page (see the Link header)")
+    for name, type_ in (filters or {}).items():
+        parser.add_argument(name, type=type_, required=False, help=f"Filter on {name}")
+    for name, type_ in (range_filters or {}).items():
+        parser.add_argument(f"{name}_min", type=type_, required=False, help=f"Minimum {name} (inclusive)")
+        parser.add_argument(f"{name}_max", type=type_, required=False, help=f"Maximum {name} (inclusive)")
+    return parser
+
+def next_page_headers(next_cursor):
+    """Link header pointing to the next page, empty on the last page"""
+    if not next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args["cursor"] = next_cursor
+    url = f"{request.base_url}?{urlencode(args)}"
+    return {"Link": f'<{url}>; rel="next"', "X-Next-Cursor": next_cursor}
@@ -2,6 +2,13 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.pays_repo import PaysRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.routes.expand import add_expand_argument, expand_parser, expanded_model, marshal_expanded, parse_expand
+from app.routes.continent_routes import continent_model
+from app.routes.region_routes import region_model
+from app.cache import cached
 
 # Define Namespace
 pays_api = Namespace("pays", description="Country related operations")
@@ -24,15 +31,37 @@ pays_create_model = pays_api.model("PaysCreate", {
     "code_continent": fields.String(required=True, description="Continent Code"),
 })
 
+pays_bulk_model = bulk_result_model(pays_api, pays_model)
+pays_lookup_model = lookup_result_model(pays_api, pays_model)
+pays_lookup_parser = lookup_parser(codes=True)
+
+# Relations that can be embedded with ?expand=continent,regions
+pays_relations = {
+    "continent": fields.Nested(continent_model, allow_null=True, description="Continent of the country"),
+    "regions": fields.List(fields.Nested(region_model), description="Regions of the country"),
+}
+pays_expanded_model = expanded_model(pays_api, pays_model, pays_relations)
+pays_expand_parser = expand_parser(pays_relations)
+
+pays_list_parser = add_expand_argument(list_parser({"code_pays": str, "code_continent": str}), pays_relations)
+
 @pays_api.route("/")
 class PaysList(Resource):
     """Handles listing and creating countries"""
 
-    @pays_api.marshal_list_with(pays_model)
+    @cached("pays")
+    @pays_api.expect(pays_list_parser)
+    @pays_api.response(200, "Success", [pays_expanded_model])
     def get(self):
-        """Get all countries"""
+        """Get countries, paginated (next page in the Link header), with ?expand=continent,regions embedded"""
+        args = pays_list_parser.parse_args()
+        expand = parse_expand(pays_api, args.pop("expand"), pays_relations)
         repo = PaysRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            pays, next_cursor = repo.get_page(expand=expand, **args)
+        except ValueError as e:
+            pays_api.abort(400, str(e))
+        return marshal_expanded(pays, pays_model, pays_relations, expand), 200, next_page_headers(next_cursor)
 
     @pays_api.expect(pays_create_model)
     @pays_api.marshal_with(pays_model, code=201)
@@ -43,18 +72,50 @@ class PaysList(Resource):
         return repo.create(**data), 201
 
 
+@pays_api.route("/bulk")
+class PaysBulk(Resource):
+    """Handles creating or updating many countries at once"""
+
+    @pays_api.expect([pays_create_model])
+    @pays_api.marshal_with(pays_bulk_model)
+    def post(self):
+        """Create or update countries by code_pays from a JSON array, in one statement"""
+        items = bulk_items(pays_api)
+        repo = PaysRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@pays_api.route("/batch")
+class PaysBatch(Resource):
+    """Handles looking up many countries at once"""
+
+    @cached("pays")
+    @pays_api.expect(pays_lookup_parser)
+    @pays_api.marshal_with(pays_lookup_model)
+    def get(self):
+        """Get countries by ?ids=1,2,3 or ?codes=FR,DE with one query, in request order"""
+        field, values = lookup_values(pays_api, pays_lookup_parser.parse_args())
+        repo = PaysRepository(db.session)
+        items = repo.get_by_ids(values) if field == "ids" else repo.get_by_codes(values)
+        return lookup_result(values, items)
+
+
 @pays_api.route("/<int:id_pays>")
 class PaysResource(Resource):
     """Handles operations on a single country"""
 
-    @pays_api.marshal_with(pays_model)
+    @cached("pays")
+    @pays_api.expect(pays_expand_parser)
+    @pays_api.response(200, "Success", pays_expanded_model)
     def get(self, id_pays):
-        """Get a country by its ID"""
+        """Get a country by its ID, with ?expand=continent,regions embedded"""
+        expand = parse_expand(pays_api, pays_expand_parser.parse_args()["expand"], pays_relations)
         repo = PaysRepository(db.session)
-        pays = repo.get_by_id(id_pays)
+        pays = repo.get_by_id(id_pays, expand=expand)
         if not pays:
             pays_api.abort(404, "Country not found")
-        return pays
+        return marshal_expanded(pays, pays_model, pays_relations, expand)
 
     @pays_api.expect(pays_create_model)
     @pays_api.marshal_with(pays_model)
@@ -79,20 +140,24 @@ class PaysResource(Resource):
 class PaysByCode(Resource):
     """Handles getting a country by its code"""
 
-    @pays_api.marshal_with(pays_model)
+    @cached("pays")
+    @pays_api.expect(pays_expand_parser)
+    @pays_api.response(200, "Success", pays_expanded_model)
     def get(self, code_pays):
-        """Get a country by its code"""
+        """Get a country by its code, with ?expand=continent,regions embedded"""
+        expand = parse_expand(pays_api, pays_expand_parser.parse_args()["expand"], pays_relations)
         repo = PaysRepository(db.session)
-        pays = repo.get_by_code(code_pays)
+        pays = repo.get_by_code(code_pays, expand=expand)
         if not pays:
             pays_api.abort(404, "Country not found")
-        return pays
+        return marshal_expanded(pays, pays_model, pays_relations, expand)
 
 
 @pays_api.route("/continent/<int:code_continent>")
 class PaysByContinent(Resource):
     """Handles getting countries by continent code"""
 
+    @cached("pays")
     @pays_api.marshal_list_with(pays_model)
     def get(self, code_continent):
         """Get countries by continent code"""
@@ -3,6 +3,10 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.periode_repo import PeriodeRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.cache import cached
 
 # Define Namespace
 periode_api = Namespace("periode", description="Periode related operations")
@@ -17,15 +21,28 @@ periode_create_model = periode_api.model("PeriodeCreate", {
     "nom": fields.String(required=True, description="Periode Name"),
 })
 
+periode_bulk_model = bulk_result_model(periode_api, periode_model)
+periode_lookup_model = lookup_result_model(periode_api, periode_model)
+periode_lookup_parser = lookup_parser(codes=False)
+
+periode_list_parser = list_parser({"nom": str})
+
 @periode_api.route("/")
 class PeriodeList(Resource):
     """Handles listing and creating periodes"""
 
+    @cached("periode")
+    @periode_api.expect(periode_list_parser)
     @periode_api.marshal_list_with(periode_model)
     def get(self):
-        """Get all periodes"""
+        """Get periodes, paginated (next page in the Link header)"""
+        args = periode_list_parser.parse_args()
         repo = PeriodeRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            periodes, next_cursor = repo.get_page(**args)
+        except ValueError as e:
+            periode_api.abort(400, str(e))
+        return periodes, 200, next_page_headers(next_cursor)
 
     @periode_api.expect(periode_create_model)
     @periode_api.marshal_with(periode_model, code=201)
@@ -36,10 +53,40 @@ class PeriodeList(Resource):
         return repo.create(**data), 201
 
 
+@periode_api.route("/bulk")
+class PeriodeBulk(Resource):
+    """Handles creating or updating many periodes at once"""
+
+    @periode_api.expect([periode_create_model])
+    @periode_api.marshal_with(periode_bulk_model)
+    def post(self):
+        """Create or update periodes by nom from a JSON array, in one statement"""
+        items = bulk_items(periode_api)
+        repo = PeriodeRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@periode_api.route("/batch")
+class PeriodeBatch(Resource):
+    """Handles looking up many periodes at once"""
+
+    @cached("periode")
+    @periode_api.expect(periode_lookup_parser)
+    @periode_api.marshal_with(periode_lookup_model)
+    def get(self):
+        """Get periodes by ?ids=1,2,3 with one query, in request order"""
+        _, values = lookup_values(periode_api, periode_lookup_parser.parse_args())
+        repo = PeriodeRepository(db.session)
+        items = repo.get_by_ids(values)
+        return lookup_result(values, items)
+
+
 @periode_api.route("/<int:id_periode>")
 class PeriodeResource(Resource):
     """Handles operations on a single periode"""
 
+    @cached("periode")
     @periode_api.marshal_with(periode_model)
     def get(self, id_periode):
         """Get a periode by its ID"""
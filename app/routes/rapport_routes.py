@@ -1,7 +1,13 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs, reqparse
 from flask import request
 from app.db import db
-from app.repositories.rapport_repo import RapportRepository
+from app.repositories.rapport_repo import RapportRepository, AGGREGATE_BUCKETS
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.routes.expand import add_expand_argument, expand_parser, expanded_model, marshal_expanded, parse_expand
+from app.routes.maladie_routes import maladie_model
+from app.routes.periode_routes import periode_model
 
 # Define Namespace
 rapport_api = Namespace("rapport", description="Rapport related operations")
@@ -36,15 +42,45 @@ rapport_create_model = rapport_api.model("RapportCreate", {
     "code_periode": fields.Integer(required=True, description="Period Code"),
 })
 
+rapport_bulk_model = bulk_result_model(rapport_api, rapport_model)
+rapport_lookup_model = lookup_result_model(rapport_api, rapport_model)
+rapport_lookup_parser = lookup_parser(codes=False)
+
+# Relations that can be embedded with ?expand=maladie,periode
+rapport_relations = {
+    "maladie": fields.Nested(maladie_model, allow_null=True, description="Disease of the rapport"),
+    "periode": fields.Nested(periode_model, allow_null=True, description="Period of the rapport"),
+}
+rapport_expanded_model = expanded_model(rapport_api, rapport_model, rapport_relations)
+rapport_expand_parser = expand_parser(rapport_relations)
+
+rapport_list_parser = add_expand_argument(
+    list_parser({"code_maladie": int, "code_periode": int, "source": str}, range_filters={"date_debut": inputs.date_from_iso8601}),
+    rapport_relations,
+)
+
+aggregate_parser = reqparse.RequestParser()
+aggregate_parser.add_argument("bucket", type=str, default="month", choices=AGGREGATE_BUCKETS, help="Time bucket on date_debut")
+aggregate_parser.add_argument("group_by", type=str, action="split", required=False, help="Comma separated dimensions: maladie, periode, pays, region, continent")
+aggregate_parser.add_argument("date_debut_min", type=inputs.date_from_iso8601, required=False, help="Start date (YYYY-MM-DD)")
+aggregate_parser.add_argument("date_debut_max", type=inputs.date_from_iso8601, required=False, help="End date (YYYY-MM-DD)")
+
 @rapport_api.route("/")
 class RapportList(Resource):
     """Handles listing and creating rapports"""
 
-    @rapport_api.marshal_list_with(rapport_model)
+    @rapport_api.expect(rapport_list_parser)
+    @rapport_api.response(200, "Success", [rapport_expanded_model])
     def get(self):
-        """Get all rapports"""
+        """Get rapports, paginated (next page in the Link header), with ?expand=maladie,periode embedded"""
+        args = rapport_list_parser.parse_args()
+        expand = parse_expand(rapport_api, args.pop("expand"), rapport_relations)
         repo = RapportRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            rapports, next_cursor = repo.get_page(expand=expand, **args)
+        except ValueError as e:
+            rapport_api.abort(400, str(e))
+        return marshal_expanded(rapports, rapport_model, rapport_relations, expand), 200, next_page_headers(next_cursor)
 
     @rapport_api.expect(rapport_create_model)
     @rapport_api.marshal_with(rapport_model, code=201)
@@ -55,18 +91,48 @@ class RapportList(Resource):
         return repo.create(**data), 201
 
 
+@rapport_api.route("/bulk")
+class RapportBulk(Resource):
+    """Handles creating many rapports at once"""
+
+    @rapport_api.expect([rapport_create_model])
+    @rapport_api.marshal_with(rapport_bulk_model)
+    def post(self):
+        """Create rapports from a JSON array, in one statement"""
+        items = bulk_items(rapport_api)
+        repo = RapportRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@rapport_api.route("/batch")
+class RapportBatch(Resource):
+    """Handles looking up many rapports at once"""
+
+    @rapport_api.expect(rapport_lookup_parser)
+    @rapport_api.marshal_with(rapport_lookup_model)
+    def get(self):
+        """Get rapports by ?ids=1,2,3 with one query, in request order"""
+        _, values = lookup_values(rapport_api, rapport_lookup_parser.parse_args())
+        repo = RapportRepository(db.session)
+        items = repo.get_by_ids(values)
+        return lookup_result(values, items)
+
+
 @rapport_api.route("/<int:code_rapport>")
 class RapportResource(Resource):
     """Handles operations on a single rapport"""
 
-    @rapport_api.marshal_with(rapport_model)
+    @rapport_api.expect(rapport_expand_parser)
+    @rapport_api.response(200, "Success", rapport_expanded_model)
     def get(self, code_rapport):
-        """Get a rapport by its ID"""
+        """Get a rapport by its ID, with ?expand=maladie,periode embedded"""
+        expand = parse_expand(rapport_api, rapport_expand_parser.parse_args()["expand"], rapport_relations)
         repo = RapportRepository(db.session)
-        rapport = repo.get_by_id(code_rapport)
+        rapport = repo.get_by_id(code_rapport, expand=expand)
         if not rapport:
             rapport_api.abort(404, "Rapport not found")
-        return rapport
+        return marshal_expanded(rapport, rapport_model, rapport_relations, expand)
 
     @rapport_api.expect(rapport_create_model)
     @rapport_api.marshal_with(rapport_model)
@@ -84,4 +150,22 @@ class RapportResource(Resource):
         repo = RapportRepository(db.session)
         if not repo.delete(code_rapport):
             rapport_api.abort(404, "Rapport not found")
-        return {"message": "Rapport deleted"}, 200
\ No newline at end of file
+        return {"message": "Rapport deleted"}, 200
+
+
+@rapport_api.route("/aggregate")
+class RapportAggregate(Resource):
+    """Handles time-bucketed aggregation of rapports"""
+
+    @rapport_api.expect(aggregate_parser)
+    def get(self):
+        """Sum new cases and deaths per time bucket and dimension"""
+        args = aggregate_parser.parse_args()
+        repo = RapportRepository(db.session)
+        try:
+            rows = repo.aggregate(**args)
+        except ValueError as e:
+            rapport_api.abort(400, str(e))
+        for row in rows:
+            row["bucket"] = row["bucket"].date().isoformat()
+        return {"bucket": args["bucket"], "group_by": args["group_by"] or [], "series": rows}, 200
@@ -2,6 +2,10 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.db import db
 from app.repositories.region_repo import RegionRepository
+from app.routes.pagination import list_parser, next_page_headers
+from app.routes.bulk import bulk_items, bulk_result_model
+from app.routes.lookup import lookup_parser, lookup_result, lookup_result_model, lookup_values
+from app.cache import cached
 
 # Define Namespace
 region_api = Namespace("regions", description="Region related operations")
@@ -20,15 +24,28 @@ region_create_model = region_api.model("RegionCreate", {
     "code_pays": fields.String(required=True, description="Country Code"),
 })
 
+region_bulk_model = bulk_result_model(region_api, region_model)
+region_lookup_model = lookup_result_model(region_api, region_model)
+region_lookup_parser = lookup_parser(codes=True)
+
+region_list_parser = list_parser({"code_region": str, "code_pays": str})
+
 @region_api.route("/")
 class RegionList(Resource):
     """Handles listing and creating regions"""
 
+    @cached("region")
+    @region_api.expect(region_list_parser)
     @region_api.marshal_list_with(region_model)
     def get(self):
-        """Get all regions"""
+        """Get regions, paginated (next page in the Link header)"""
+        args = region_list_parser.parse_args()
         repo = RegionRepository(db.session)
-        return repo.get_all(), 200
+        try:
+            regions, next_cursor = repo.get_page(**args)
+        except ValueError as e:
+            region_api.abort(400, str(e))
+        return regions, 200, next_page_headers(next_cursor)
 
     @region_api.expect(region_create_model)
     @region_api.marshal_with(region_model, code=201)
@@ -39,10 +56,40 @@ class RegionList(Resource):
         return repo.create(**data), 201
 
 
+@region_api.route("/bulk")
+class RegionBulk(Resource):
+    """Handles creating or updating many regions at once"""
+
+    @region_api.expect([region_create_model])
+    @region_api.marshal_with(region_bulk_model)
+    def post(self):
+        """Create or update regions by code_region from a JSON array, in one statement"""
+        items = bulk_items(region_api)
+        repo = RegionRepository(db.session)
+        stored, errors = repo.bulk_upsert(items)
+        return {"items": stored, "errors": errors}
+
+
+@region_api.route("/batch")
+class RegionBatch(Resource):
+    """Handles looking up many regions at once"""
+
+    @cached("region")
+    @region_api.expect(region_lookup_parser)
+    @region_api.marshal_with(region_lookup_model)
+    def get(self):
+        """Get regions by ?ids=1,2,3 or ?codes=R1,R2 with one query, in request order"""
+        field, values = lookup_values(region_api, region_lookup_parser.parse_args())
+        repo = RegionRepository(db.session)
+        items = repo.get_by_ids(values) if field == "ids" else repo.get_by_codes(values)
+        return lookup_result(values, items)
+
+
 @region_api.route("/<int:id_region>")
 class RegionResource(Resource):
     """Handles operations on a single region"""
 
+    @cached("region")
     @region_api.marshal_with(region_model)
     def get(self, id_region):
         """Get a region by its ID"""
@@ -75,6 +122,7 @@ class RegionResource(Resource):
 class RegionByCode(Resource):
     """Handles getting a region by its code"""
 
+    @cached("region")
     @region_api.marshal_with(region_model)
     def get(self, code_region):
         """Get a region by its code"""
@@ -89,6 +137,7 @@ class RegionByCode(Resource):
 class RegionsByPays(Resource):
     """Handles getting regions by country code"""
 
+    @cached("region")
     @region_api.marshal_list_with(region_model)
     def get(self, code_pays):
         """Get regions by country code"""
@@ -0,0 +1,51 @@
+"""Small HTTP load generator: python bench_serving.py http://127.0.0.1:5000/api/health/status --concurrency 16"""
+import argparse
+import statistics
+import threading
+import time
+import requests
+
+def worker(url, deadline, latencies, errors):
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=10)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+                continue
+        except requests.RequestException as e:
+            errors.append(e)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+def run(url, concurrency, duration):
+    """Requests/sec and latency percentiles with `concurrency` clients for `duration` seconds"""
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker, args=(url, deadline, latencies, errors)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure requests/sec of a running API")
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    result = run(args.url, args.concurrency, args.duration)
+    print(f"{result['requests']} requests, {result['errors']} errors in {args.duration:.0f}s "
+          f"with {args.concurrency} clients: {result['rps']:.0f} req/s, "
+          f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
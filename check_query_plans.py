@@ -0,0 +1,142 @@
+"""EXPLAIN the repository queries on the configured Postgres: python check_query_plans.py --threshold 10000"""
+import argparse
+import datetime
+import sys
+from sqlalchemy import event
+from app import create_app, models
+from app.db import db
+from app.repositories.concerne_repo import ConcerneRepository
+from app.repositories.continent_repo import ContinentRepository
+from app.repositories.maladie_repo import MaladieRepository
+from app.repositories.pays_repo import PaysRepository
+from app.repositories.periode_repo import PeriodeRepository
+from app.repositories.rapport_repo import RapportRepository
+from app.repositories.region_repo import RegionRepository
+
+# Every query the API sends for a lookup is captured while the repository method runs,
+# then explained with the same parameters. A sequential scan is only reported on tables
+# larger than the threshold: on small tables it is the cheapest plan, indexes or not.
+DEFAULT_ROW_THRESHOLD = 10000
+TABLES = ["continent", "pays", "region", "maladie", "periode", "rapport", "concerne"]
+
+def sample_values(session):
+    """Existing keys to filter on, so that the planner estimates real selectivities"""
+    def first(column, default):
+        value = session.query(column).order_by(column).limit(1).scalar()
+        return default if value is None else value
+
+    date_debut = first(models.Rapport.date_debut, datetime.date(2020, 1, 1))
+    return {
+        "code_continent": first(models.Continent.code_continent, "EU"),
+        "code_pays": first(models.Pays.code_pays, "FRA"),
+        "code_region": first(models.Region.code_region, "IDF"),
+        "id_maladie": first(models.Maladie.id, 1),
+        "id_periode": first(models.Periode.id, 1),
+        "id_rapport": first(models.Rapport.id, 1),
+        "date_debut_min": date_debut,
+        "date_debut_max": date_debut + datetime.timedelta(days=30),
+    }
+
+def repository_queries(session, v):
+    """(name, call) pairs of the repository reads served by the API (full table reads excluded)"""
+    continents = ContinentRepository(session)
+    pays = PaysRepository(session)
+    regions = RegionRepository(session)
+    maladies = MaladieRepository(session)
+    periodes = PeriodeRepository(session)
+    rapports = RapportRepository(session)
+    concernes = ConcerneRepository(session)
+    period = {"date_debut_min": v["date_debut_min"], "date_debut_max": v["date_debut_max"]}
+    return [
+        ("continent.get_page", lambda: continents.get_page()),
+        ("continent.get_by_code", lambda: continents.get_by_code(v["code_continent"])),
+        ("continent.get_by_codes", lambda: continents.get_by_codes([v["code_continent"]])),
+        ("pays.get_page(code_continent)", lambda: pays.get_page(code_continent=v["code_continent"])),
+        ("pays.get_page(expand)", lambda: pays.get_page(limit=10, expand=["continent", "regions"])),
+        ("pays.get_by_code(expand)", lambda: pays.get_by_code(v["code_pays"], expand=["continent", "regions"])),
+        ("pays.get_by_codes", lambda: pays.get_by_codes([v["code_pays"]])),
+        ("pays.get_by_continent", lambda: pays.get_by_continent(v["code_continent"])),
+        ("region.get_page(code_pays)", lambda: regions.get_page(code_pays=v["code_pays"])),
+        ("region.get_by_code", lambda: regions.get_by_code(v["code_region"])),
+        ("region.get_by_pays", lambda: regions.get_by_pays(v["code_pays"])),
+        ("maladie.get_by_ids", lambda: maladies.get_by_ids([v["id_maladie"]])),
+        ("periode.get_by_ids", lambda: periodes.get_by_ids([v["id_periode"]])),
+        ("rapport.get_by_id(expand)", lambda: rapports.get_by_id(v["id_rapport"], expand=["maladie", "periode"])),
+        ("rapport.get_page(code_maladie)", lambda: rapports.get_page(code_maladie=v["id_maladie"])),
+        ("rapport.get_page(code_periode)", lambda: rapports.get_page(code_periode=v["id_periode"])),
+        ("rapport.get_page(date_debut)", lambda: rapports.get_page(**period)),
+        ("rapport.get_page(code_maladie, date_debut)", lambda: rapports.get_page(code_maladie=v["id_maladie"], **period)),
+        ("rapport.aggregate(date_debut)", lambda: rapports.aggregate(**period)),
+        ("rapport.aggregate(pays, date_debut)", lambda: rapports.aggregate(group_by=["pays"], **period)),
+        ("concerne.get_page(code_pays)", lambda: concernes.get_page(code_pays=v["code_pays"])),
+        ("concerne.get_page(code_region)", lambda: concernes.get_page(code_region=v["code_region"])),
+        ("concerne.get_page(code_rapport)", lambda: concernes.get_page(code_rapport=v["id_rapport"])),
+    ]
+
+def capture_selects(engine, call):
+    """SELECT statements (with their DBAPI parameters) sent to the database while call() runs"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def explain(connection, statement, parameters):
+    """Plan nodes of a statement, from the root down"""
+    explained = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return list(plan_nodes(explained[0]["Plan"]))
+
+def seq_scans(connection, statement, parameters, table_rows, threshold):
+    """(table, rows) of the sequential scans on tables above threshold rows in the plan of a statement"""
+    return [(node["Relation Name"], table_rows.get(node["Relation Name"], 0))
+            for node in explain(connection, statement, parameters)
+            if node["Node Type"] == "Seq Scan" and table_rows.get(node["Relation Name"], 0) > threshold]
+
+def check(threshold, analyze=True):
+    """Print the plan check of each repository query, returns the number of failing queries"""
+    engine = db.engine
+    if analyze:
+        # Fresh statistics, otherwise the planner works from the row counts of the last autovacuum
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql(f"ANALYZE {', '.join(TABLES)}")
+
+    session = db.session
+    with engine.connect() as connection:
+        table_rows = dict(connection.exec_driver_sql(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'p')"
+        ).all())
+        failures = 0
+        for name, call in repository_queries(session, sample_values(session)):
+            scans = []
+            for statement, parameters in capture_selects(engine, call):
+                scans += seq_scans(connection, statement, parameters, table_rows, threshold)
+            session.rollback()
+            if scans:
+                failures += 1
+                print(f"FAIL {name}: " + ", ".join(f"Seq Scan on {table} (~{rows:.0f} rows)" for table, rows in scans))
+            else:
+                print(f"ok   {name}")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a repository query plans a sequential scan on a large table")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_ROW_THRESHOLD, help="Table size (rows) above which a Seq Scan fails")
+    parser.add_argument("--no-analyze", action="store_true", help="Keep the current planner statistics")
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        failures = check(args.threshold, analyze=not args.no_analyze)
+    print(f"{failures} queries with a sequential scan above {args.threshold} rows.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,22 @@
+import os
+
+# Production server settings, overridable with environment variables
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+# One process by default: the response cache is per process, so with several workers a write
+# only invalidates the cache of the worker serving it and the others answer stale responses
+# until RESPONSE_CACHE_TTL expires. Raise GUNICORN_WORKERS only on several cores, accepting that.
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))  # ETL uploads are streamed to disk before the job starts
+keepalive = 5
+# Worker recycling is off by default: a recycled worker takes its running ETL jobs down with it
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = 500 if max_requests else 0
+
+# Every worker builds its own app, so database pools, the response cache and
+# the ETL job pool are created after fork and never shared between processes
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
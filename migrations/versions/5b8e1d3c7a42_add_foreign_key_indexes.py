@@ -0,0 +1,40 @@
+"""Add indexes on foreign key and date columns
+
+Revision ID: 5b8e1d3c7a42
+Revises: 282de599e4c4
+Create Date: 2026-10-18 10:12:31.482977
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e1d3c7a42'
+down_revision = '282de599e4c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_pays_code_continent'), 'pays', ['code_continent'], unique=False)
+    op.create_index(op.f('ix_region_code_pays'), 'region', ['code_pays'], unique=False)
+    # rapport.code_maladie alone is served by the leading column of the composite index
+    op.create_index('ix_rapport_code_maladie_date_debut', 'rapport', ['code_maladie', 'date_debut'], unique=False)
+    op.create_index(op.f('ix_rapport_code_periode'), 'rapport', ['code_periode'], unique=False)
+    op.create_index(op.f('ix_rapport_date_debut'), 'rapport', ['date_debut'], unique=False)
+    # concerne.code_continent is the leading column of the primary key
+    op.create_index(op.f('ix_concerne_code_pays'), 'concerne', ['code_pays'], unique=False)
+    op.create_index(op.f('ix_concerne_code_region'), 'concerne', ['code_region'], unique=False)
+    op.create_index(op.f('ix_concerne_code_rapport'), 'concerne', ['code_rapport'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_concerne_code_rapport'), table_name='concerne')
+    op.drop_index(op.f('ix_concerne_code_region'), table_name='concerne')
+    op.drop_index(op.f('ix_concerne_code_pays'), table_name='concerne')
+    op.drop_index(op.f('ix_rapport_date_debut'), table_name='rapport')
+    op.drop_index(op.f('ix_rapport_code_periode'), table_name='rapport')
+    op.drop_index('ix_rapport_code_maladie_date_debut', table_name='rapport')
+    op.drop_index(op.f('ix_region_code_pays'), table_name='region')
+    op.drop_index(op.f('ix_pays_code_continent'), table_name='pays')
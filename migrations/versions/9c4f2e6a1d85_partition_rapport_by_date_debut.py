@@ -0,0 +1,130 @@
+"""Partition rapport by range of date_debut
+
+Revision ID: 9c4f2e6a1d85
+Revises: 5b8e1d3c7a42
+Create Date: 2026-10-18 14:37:05.219846
+
+"""
+import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f2e6a1d85'
+down_revision = '5b8e1d3c7a42'
+branch_labels = None
+depends_on = None
+
+# Yearly partitions from the first rapport to two years ahead, as RAPPORT_PARTITIONS did when
+# this revision was written; app/database/partitions.py maintains them from then on
+PARTITIONS_AHEAD = 2
+
+COLUMNS = ('id, date_debut, date_fin, source, nouveaux_cas, nouveaux_deces, nouveaux_gueris, '
+           'cas_actifs, taux_mortalite, taux_guerison, code_maladie, code_periode')
+
+# concerne loses its foreign key to rapport.id (not unique on its own in a partitioned table):
+# these triggers check that the rapport exists and cascade its deletes, as the foreign key did
+TRIGGERS = """
+CREATE FUNCTION concerne_check_rapport() RETURNS trigger AS $$
+BEGIN
+    PERFORM 1 FROM rapport WHERE id = NEW.code_rapport FOR KEY SHARE;
+    IF NOT FOUND THEN
+        RAISE foreign_key_violation USING MESSAGE = format('rapport %s does not exist', NEW.code_rapport);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER concerne_check_rapport BEFORE INSERT OR UPDATE OF code_rapport ON concerne
+    FOR EACH ROW EXECUTE FUNCTION concerne_check_rapport();
+
+-- Statement level, so that it only fires for DELETE statements: a row moved to another partition
+-- by an UPDATE of date_debut fires the row-level DELETE triggers of its old partition, not this one
+CREATE FUNCTION rapport_delete_concerne() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM concerne WHERE code_rapport IN (SELECT id FROM deleted_rapport);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rapport_delete_concerne AFTER DELETE ON rapport
+    REFERENCING OLD TABLE AS deleted_rapport
+    FOR EACH STATEMENT EXECUTE FUNCTION rapport_delete_concerne();
+"""
+
+
+def create_rapport_table(primary_key, **kwargs):
+    op.create_table('rapport',
+    sa.Column('id', sa.Integer(), sa.Identity(always=False, start=1, increment=1), nullable=False),
+    sa.Column('date_debut', sa.Date(), nullable=False),
+    sa.Column('date_fin', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=50), nullable=True),
+    sa.Column('nouveaux_cas', sa.Integer(), nullable=True),
+    sa.Column('nouveaux_deces', sa.Integer(), nullable=True),
+    sa.Column('nouveaux_gueris', sa.Integer(), nullable=True),
+    sa.Column('cas_actifs', sa.Integer(), nullable=True),
+    sa.Column('taux_mortalite', sa.Integer(), nullable=True),
+    sa.Column('taux_guerison', sa.Integer(), nullable=True),
+    sa.Column('code_maladie', sa.Integer(), nullable=False),
+    sa.Column('code_periode', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['code_maladie'], ['maladie.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['code_periode'], ['periode.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint(*primary_key),
+    **kwargs
+    )
+    op.create_index('ix_rapport_code_maladie_date_debut', 'rapport', ['code_maladie', 'date_debut'], unique=False)
+    op.create_index(op.f('ix_rapport_code_periode'), 'rapport', ['code_periode'], unique=False)
+    op.create_index(op.f('ix_rapport_date_debut'), 'rapport', ['date_debut'], unique=False)
+
+
+def set_aside_rapport_table(name):
+    """Rename rapport and the names it owns, so that the new rapport table can be created next to it"""
+    op.drop_index('ix_rapport_code_maladie_date_debut', table_name='rapport')
+    op.drop_index(op.f('ix_rapport_code_periode'), table_name='rapport')
+    op.drop_index(op.f('ix_rapport_date_debut'), table_name='rapport')
+    op.rename_table('rapport', name)
+    op.execute(f'ALTER TABLE {name} RENAME CONSTRAINT rapport_pkey TO {name}_pkey')
+    op.execute(f'ALTER SEQUENCE rapport_id_seq RENAME TO {name}_id_seq')
+
+
+def create_yearly_partitions(first_year, last_year):
+    op.execute('CREATE TABLE rapport_default PARTITION OF rapport DEFAULT')
+    for year in range(first_year, last_year + 1):
+        op.execute(f"CREATE TABLE rapport_{year} PARTITION OF rapport FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')")
+
+
+def copy_rapport_rows(source):
+    op.execute(f'INSERT INTO rapport ({COLUMNS}) SELECT {COLUMNS} FROM {source}')
+    op.execute("SELECT setval(pg_get_serial_sequence('rapport', 'id'), coalesce(max(id), 0) + 1, false) FROM rapport")
+    op.drop_table(source)
+
+
+def upgrade():
+    op.drop_constraint('concerne_code_rapport_fkey', 'concerne', type_='foreignkey')
+    set_aside_rapport_table('rapport_old')
+
+    # The partition key has to be part of the primary key
+    create_rapport_table(['id', 'date_debut'], postgresql_partition_by='RANGE (date_debut)')
+    this_year = datetime.date.today().year
+    first = op.get_bind().execute(sa.text('SELECT min(date_debut) FROM rapport_old')).scalar()
+    create_yearly_partitions(min(first.year, this_year) if first else this_year, this_year + PARTITIONS_AHEAD)
+    copy_rapport_rows('rapport_old')
+
+    op.execute(TRIGGERS)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER rapport_delete_concerne ON rapport')
+    op.execute('DROP FUNCTION rapport_delete_concerne()')
+    op.execute('DROP TRIGGER concerne_check_rapport ON concerne')
+    op.execute('DROP FUNCTION concerne_check_rapport()')
+
+    # Attached partitions are dropped with the partitioned table, detached ones are left as they are
+    set_aside_rapport_table('rapport_partitioned')
+    create_rapport_table(['id'])
+    copy_rapport_rows('rapport_partitioned')
+
+    # Links to rapports of detached partitions cannot satisfy the foreign key
+    op.execute('DELETE FROM concerne WHERE code_rapport NOT IN (SELECT id FROM rapport)')
+    op.create_foreign_key('concerne_code_rapport_fkey', 'concerne', 'rapport', ['code_rapport'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,30 @@
+from app.models import Pays, Rapport
+from app.repositories.bulk import validate_items
+
+PAYS = {"code_pays": "FRA", "nom": "France", "code_continent": "EU"}
+
+
+def test_out_of_range_integer_is_reported_on_its_item():
+    rows, errors = validate_items(Pays, [dict(PAYS, pib=2 ** 31 - 1), dict(PAYS, pib=2 ** 31), dict(PAYS, pib=-2 ** 31 - 1)])
+    assert [index for index, _ in rows] == [0]
+    assert [error["index"] for error in errors] == [1, 2]
+    assert "'pib' must be between -2147483648 and 2147483647" in errors[0]["error"]
+
+
+def test_numeric_overflow_is_reported_on_its_item():
+    # temperature is NUMERIC(15, 2): at most 13 digits before the decimal point
+    rows, errors = validate_items(Pays, [dict(PAYS, temperature=9999999999999.99), dict(PAYS, temperature=10 ** 13),
+                                         dict(PAYS, temperature=9999999999999.999)])
+    assert [index for index, _ in rows] == [0]
+    assert [error["index"] for error in errors] == [1, 2]
+
+
+def test_non_finite_numbers_are_rejected():
+    _, errors = validate_items(Pays, [dict(PAYS, temperature=float("nan")), dict(PAYS, temperature=float("inf"))])
+    assert [error["error"] for error in errors] == ["'temperature' must be a finite number"] * 2
+
+
+def test_integer_range_applies_to_every_integer_column():
+    item = {"date_debut": "2021-01-01", "date_fin": "2021-01-07", "code_maladie": 1, "code_periode": 1, "nouveaux_cas": 2 ** 40}
+    rows, errors = validate_items(Rapport, [item])
+    assert not rows and "'nouveaux_cas'" in errors[0]["error"]
@@ -0,0 +1,24 @@
+from app.cache import ResponseCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=60)
+    cache.set(("pays", "/api/pays/?"), b"[]", {}, cache.generation("pays"))
+
+    now[0] += 59
+    assert cache.get(("pays", "/api/pays/?")) is not None
+    now[0] += 1
+    assert cache.get(("pays", "/api/pays/?")) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_entries_without_ttl_never_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache()
+    cache.set(("pays", "/api/pays/?"), b"[]", {}, cache.generation("pays"))
+    now[0] += 10 ** 6
+    assert cache.get(("pays", "/api/pays/?")) is not None
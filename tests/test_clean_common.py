@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from app.etl.components.clean_common import bornes_iqr, clean_by_group, corriger_aberrantes
+
+COLUMNS = ["total_tests", "new_tests"]
+
+
+def previous_cleaning(data, columns):
+    """The per-country loops that clean_by_group and corriger_aberrantes replaced"""
+    for col in columns:
+        data[col] = pd.to_numeric(data[col], errors="coerce")
+        data.loc[data[col] < 0, col] = np.nan
+
+    for pays in data["country"].unique():
+        mask = data["country"] == pays
+        for col in columns:
+            data.loc[mask, col] = data.loc[mask, col].interpolate(method="linear")
+
+    for col in data.select_dtypes(include=["number"]).columns:
+        data[col] = data[col].fillna(0)
+    for col in data.select_dtypes(include=["object"]).columns:
+        if col != "country":
+            data[col] = data[col].fillna("")
+
+    for col in columns:
+        q1, q3 = data[col].quantile(0.25), data[col].quantile(0.75)
+        limite_inf, limite_sup = max(0, q1 - 1.5 * (q3 - q1)), q3 + 1.5 * (q3 - q1)
+        data.loc[data[col] > limite_sup, col] = limite_sup
+        data.loc[data[col] < limite_inf, col] = limite_inf
+    return data
+
+
+def test_clean_by_group_matches_the_per_country_loops():
+    data = pd.DataFrame({
+        # Leading, inner and trailing gaps, a negative value, an outlier and a text column with gaps
+        "country": ["FR"] * 6 + ["DE"] * 5 + ["IT"] * 3,
+        "total_tests": [np.nan, 100, np.nan, np.nan, 400, np.nan, 10, -5, 30, np.nan, 50, np.nan, np.nan, np.nan],
+        "new_tests": ["1", "2", None, "4", "100000", "6", np.nan, 3, 3, 3, np.nan, 7, -1, 9],
+        "units": ["tests", None, "tests", None, None, "tests", "people", None, None, None, None, None, "x", None],
+    }, index=[13, 2, 7, 0, 11, 5, 9, 1, 12, 3, 8, 4, 10, 6])
+
+    expected = previous_cleaning(data.copy(), COLUMNS)
+
+    cleaned, _ = clean_by_group(data.copy(), COLUMNS, group_col="country")
+    corriger_aberrantes(cleaned, bornes_iqr(cleaned, COLUMNS))
+
+    assert_frame_equal(cleaned, expected)
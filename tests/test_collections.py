@@ -0,0 +1,50 @@
+import pytest
+from pymongo import errors
+from app import create_app
+from app.etl.components import mongodb
+from config import Config
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class SqliteConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    TESTING = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(mongodb._collection_infos_cache, "data", None)
+    return create_app(SqliteConfig).test_client()
+
+
+def test_a_failing_collection_does_not_hide_the_others(client, monkeypatch):
+    db = mongomock.MongoClient()["api_db"]
+    db["cases"].insert_one({"country": "FR"})
+    db["broken"].insert_one({"country": "DE"})
+    monkeypatch.setattr(mongodb, "get_db", lambda: db)
+
+    def get_storage_stats(collection_name):
+        if collection_name == "broken":
+            raise errors.OperationFailure("collStats failed")
+        return {"count": 1}
+    monkeypatch.setattr(mongodb, "get_storage_stats", get_storage_stats)
+
+    response = client.get("/api/etl/collections")
+
+    assert response.status_code == 200
+    collections = {info["collection"]: info for info in response.json["collections"]}
+    assert collections["cases"]["count"] == 1
+    assert collections["broken"]["error"] == "collStats failed"
+    # Not cached, the failing collection is read again by the next request
+    assert mongodb._collection_infos_cache["data"] is None
+
+
+def test_collections_fail_when_mongo_is_unreachable(client, monkeypatch):
+    def get_db():
+        raise errors.ServerSelectionTimeoutError("no servers")
+    monkeypatch.setattr(mongodb, "get_db", get_db)
+
+    response = client.get("/api/etl/collections")
+    assert response.status_code == 500
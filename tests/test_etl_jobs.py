@@ -0,0 +1,92 @@
+import socket
+import subprocess
+import sys
+import time
+import pytest
+from app.etl import jobs
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    db = mongomock.MongoClient()["api_db"]
+    monkeypatch.setattr(jobs, "get_db", lambda: db)
+    return db
+
+
+def wait_finished(manager, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = manager.get(job_id)
+        if status["state"] not in jobs.UNFINISHED_STATES:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {status['state']}")
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_job_state_is_shared_between_processes(mongo_db):
+    worker = jobs.JobManager()
+
+    def ingest(job):
+        job.progress(5)
+        return 7
+    job = worker.submit("upload", "coll", ingest)
+
+    # Another API process only shares the store with the one running the job
+    other = jobs.JobManager()
+    status = wait_finished(other, job.id)
+    assert status["state"] == "done"
+    assert status["rows"] == 7
+    assert status["elapsed"] is not None
+    assert [listed["id"] for listed in other.list()] == [job.id]
+
+
+def test_failed_job_reports_its_error(mongo_db):
+    manager = jobs.JobManager()
+
+    def ingest(job):
+        raise ValueError("No data after transformation")
+    job = manager.submit("upload", "coll", ingest)
+
+    status = wait_finished(manager, job.id)
+    assert status["state"] == "failed"
+    assert status["error"] == "No data after transformation"
+
+
+def test_job_of_a_dead_process_fails_and_its_file_is_removed(mongo_db, tmp_path):
+    upload = tmp_path / "etl-upload.csv"
+    upload.write_text("a,b\n1,2\n")
+    job = jobs.Job("upload", "coll", temp_path=str(upload))
+    job.state = "running"
+    job.worker = f"{socket.gethostname()}:{dead_pid()}"
+    jobs.MongoJobStore().save(job)
+
+    status = jobs.JobManager().get(job.id)
+
+    assert status["state"] == "failed"
+    assert "exited" in status["error"]
+    assert not upload.exists()
+
+
+def test_job_of_a_live_process_is_left_running(mongo_db, tmp_path):
+    upload = tmp_path / "etl-upload.csv"
+    upload.write_text("a,b\n1,2\n")
+    job = jobs.Job("upload", "coll", temp_path=str(upload))
+    job.state = "running"
+    jobs.MongoJobStore().save(job)
+
+    jobs.JobManager().recover_orphans()
+
+    assert jobs.JobManager().get(job.id)["state"] == "running"
+    assert upload.exists()
+
+
+def test_unknown_job(mongo_db):
+    assert jobs.JobManager().get("missing") is None
@@ -0,0 +1,146 @@
+import os
+import pytest
+import main2
+
+
+def fake_run_dataset(file_key, full=False):
+    if file_key.startswith("killed"):
+        # Same outcome as the OOM killer: the worker process disappears without a result
+        os._exit(1)
+    if file_key.startswith("error"):
+        raise ValueError(f"{file_key} failed")
+    return 3, ("2021-01-01T00:00:00", f"hash-{file_key}")
+
+
+@pytest.fixture
+def datasets(monkeypatch):
+    monkeypatch.setattr(main2, "run_dataset", fake_run_dataset)
+    monkeypatch.setattr(main2, "estimate_memory", lambda file_key: 0)
+
+
+def by_dataset(results):
+    assert len(results) == len({result["dataset"] for result in results})
+    return {result["dataset"]: result for result in results}
+
+
+def test_run_parallel_runs_every_dataset(datasets):
+    results = by_dataset(main2.run_parallel(["a", "b", "c"], jobs=2))
+
+    assert set(results) == {"a", "b", "c"}
+    assert all(result["error"] is None and result["rows"] == 3 for result in results.values())
+
+
+def test_run_parallel_keeps_failures_per_dataset(datasets):
+    results = by_dataset(main2.run_parallel(["a", "error-b", "c"], jobs=2))
+
+    assert results["error-b"]["error"] == "ValueError: error-b failed"
+    assert results["a"]["error"] is None and results["c"]["error"] is None
+
+
+def test_run_parallel_survives_a_killed_worker(datasets):
+    results = by_dataset(main2.run_parallel(["a", "killed-b", "c", "d"], jobs=1))
+
+    assert set(results) == {"a", "killed-b", "c", "d"}
+    assert results["killed-b"]["error"].startswith("BrokenProcessPool")
+    # Finished before the crash, and started again in a new pool after it
+    assert results["a"]["error"] is None
+    assert results["c"]["error"] is None and results["d"]["error"] is None
+
+
+def test_run_parallel_fails_datasets_running_with_a_killed_worker(datasets):
+    results = by_dataset(main2.run_parallel(["killed-a", "b", "c"], jobs=3))
+
+    assert set(results) == {"killed-a", "b", "c"}
+    assert results["killed-a"]["error"].startswith("BrokenProcessPool")
+    assert all(result["elapsed"] >= 0 for result in results.values())
+
+
+def test_run_etl_only_saves_watermarks_of_successful_datasets(datasets, monkeypatch):
+    saved = {}
+    monkeypatch.setitem(main2.CONFIG, "datasets", {"a": {}, "error-b": {}, "killed-c": {}})
+    monkeypatch.setattr(main2, "save_watermark", lambda file_key, date, source_hash: saved.setdefault(file_key, date))
+
+    results = by_dataset(main2.run_etl(jobs=2))
+
+    assert saved == {"a": "2021-01-01T00:00:00"}
+    assert results["error-b"]["error"] and results["killed-c"]["error"]
+
+
+def test_run_dataset_returns_no_watermark_when_the_load_fails(monkeypatch, tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("date_debut\n2021-01-01\n")
+    monkeypatch.setitem(main2.CONFIG, "datasets", {"a": {"input_file": str(source)}})
+    monkeypatch.setattr(main2, "get_watermark", lambda file_key: None)
+    monkeypatch.setattr(main2, "transform_data", lambda file_key, since=None: main2.pd.DataFrame({"date_debut": ["2021-01-01"]}))
+
+    def failing_load(file_key, since=None):
+        raise ValueError("Maladie inconnue dans la base : COVID-19")
+    monkeypatch.setattr(main2, "load_data", failing_load)
+
+    with pytest.raises(ValueError):
+        main2.run_dataset("a")
+
+
+def test_run_dataset_holds_the_watermark_before_rejected_rows(monkeypatch, tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("date_debut\n2021-01-01\n")
+    monkeypatch.setitem(main2.CONFIG, "datasets", {"a": {"input_file": str(source)}})
+    monkeypatch.setattr(main2, "get_watermark", lambda file_key: None)
+    dates = ["2021-01-01", "2021-01-02", "2021-01-03", "2021-01-04"]
+    monkeypatch.setattr(main2, "transform_data", lambda file_key, since=None: main2.pd.DataFrame({"date_debut": dates}))
+    # Unknown pays on the 3rd: the 3rd and 4th are loaded again by the next run
+    monkeypatch.setattr(main2, "load_data", lambda file_key, since=None: main2.pd.DataFrame({"date_debut": ["2021-01-03"]}))
+
+    rows, watermark = main2.run_dataset("a")
+
+    assert rows == 3
+    assert watermark == ("2021-01-02T00:00:00", None)
+
+
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    database_url = os.environ.get("TEST_DATABASE_URL")
+    if not database_url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from flask_migrate import upgrade
+    from sqlalchemy import text
+    from app import create_app
+    from app.db import db
+    from components import loadToDataBase
+    from config import Config
+
+    class PostgresConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        TESTING = True
+
+    app = create_app(PostgresConfig)
+    with app.app_context():
+        upgrade(directory="migrations")
+        with db.engine.begin() as connection:
+            connection.execute(text("""
+                TRUNCATE concerne, rapport, region, pays, continent, maladie, periode RESTART IDENTITY CASCADE;
+                INSERT INTO continent (code_continent, nom) VALUES ('EU', 'Europe');
+                INSERT INTO pays (code_pays, nom, code_continent) VALUES ('FR', 'France', 'EU');
+                INSERT INTO maladie (nom) VALUES ('COVID-19');
+                INSERT INTO periode (nom) VALUES ('2021');
+            """))
+    monkeypatch.setattr(loadToDataBase, "PROCESSED_DATA_PATH", str(tmp_path))
+    monkeypatch.setitem(loadToDataBase.CONFIG["datasets"], "test",
+                        {"output_file": "test", "output_format": "csv", "maladie": "COVID-19"})
+
+    def load(rows, since=None):
+        main2.pd.DataFrame(rows, columns=["date_debut", "code_pays", "nouveaux_cas"]).to_csv(tmp_path / "test.csv", index=False)
+        loadToDataBase.load_data("test", app=app, since=since)
+        with app.app_context():
+            return db.session.execute(text("SELECT date_debut::text, nouveaux_cas FROM rapport ORDER BY date_debut")).all()
+    return load
+
+
+def test_load_data_replaces_the_rapports_it_reloads(database):
+    rows = [("2021-01-01", "FR", 1), ("2021-01-02", "FR", 2)]
+    assert database(rows) == [("2021-01-01", 1), ("2021-01-02", 2)]
+    # A full reload replaces every rapport of the maladie
+    assert database(rows) == [("2021-01-01", 1), ("2021-01-02", 2)]
+    # An incremental run only replaces those after its watermark
+    assert database([("2021-01-02", "FR", 5), ("2021-01-03", "FR", 3)], since="2021-01-01T00:00:00") == \
+        [("2021-01-01", 1), ("2021-01-02", 5), ("2021-01-03", 3)]
@@ -0,0 +1,69 @@
+import datetime
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.cache import response_cache
+from app.db import db
+from app.models import Continent, Maladie, Pays, Periode, Rapport, Region
+from config import Config
+
+ROWS = 60
+
+
+class SqliteConfig(Config):
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    TESTING = True
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    SqliteConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('db') / 'api.db'}"
+    app = create_app(SqliteConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Continent(code_continent="EU", nom="Europe"), Maladie(id=1, nom="COVID"), Periode(id=1, nom="2021")])
+        for i in range(ROWS):
+            db.session.add(Pays(code_pays=f"P{i}", nom=f"Pays {i}", code_continent="EU"))
+            db.session.add_all([Region(code_region=f"P{i}-R{j}", nom=f"Region {j}", code_pays=f"P{i}") for j in range(3)])
+            db.session.add(Rapport(id=i + 1, date_debut=datetime.date(2021, 1, 1) + datetime.timedelta(days=i),
+                                   date_fin=datetime.date(2021, 1, 2) + datetime.timedelta(days=i), code_maladie=1, code_periode=1))
+        db.session.commit()
+        yield app.test_client(), db.engine
+
+
+def count_queries(client, url):
+    """(response, number of statements sent to the database) of a GET request, bypassing the response cache"""
+    test_client, engine = client
+    for namespace in ("continent", "pays", "region", "rapport"):
+        response_cache.invalidate(namespace)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = test_client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.json
+    return response, len(statements)
+
+
+@pytest.mark.parametrize("url, queries", [
+    # The page, with its continent joined, then one SELECT ... IN for the regions of the page
+    ("/api/pays/?expand=continent,regions&limit={limit}", 2),
+    ("/api/rapport/?expand=maladie,periode&limit={limit}", 1),
+])
+def test_expand_issues_a_fixed_number_of_queries(client, url, queries):
+    small, small_count = count_queries(client, url.format(limit=2))
+    large, large_count = count_queries(client, url.format(limit=50))
+    assert len(small.json) == 2 and len(large.json) == 50
+    assert small_count == large_count == queries
+
+
+def test_expanded_relations_are_embedded(client):
+    response, _ = count_queries(client, "/api/pays/?expand=continent,regions&limit=10")
+    first = response.json[0]
+    assert first["continent"]["code_continent"] == "EU"
+    assert sorted(region["code_region"] for region in first["regions"]) == ["P0-R0", "P0-R1", "P0-R2"]
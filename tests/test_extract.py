@@ -0,0 +1,94 @@
+import gzip
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.etl.components.extract import download_csv
+
+CSV = b"date,country,new_cases\n" + b"".join(b"2021-01-%02d,FR,%d\n" % (day, day) for day in range(1, 29)) * 500
+
+
+class CsvHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/data.csv":
+            self.reply(CSV)
+        elif self.path == "/gzip.csv":
+            self.reply(gzip.compress(CSV), {"Content-Encoding": "gzip"})
+        elif self.path == "/data.csv.gz":
+            self.reply(gzip.compress(CSV), {"Content-Type": "application/gzip"})
+        elif self.path == "/truncated.csv":
+            # Announces the whole file but closes the connection halfway
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(CSV)))
+            self.end_headers()
+            self.wfile.write(CSV[:len(CSV) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+        else:
+            self.send_error(404)
+
+    def reply(self, body, headers=None):
+        self.send_response(200)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CsvHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    # download_csv creates its file with tempfile.mkstemp
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+def test_download_streams_the_body_to_a_temp_file(server, temp_dir):
+    path = download_csv(f"{server}/data.csv", chunk_size=4096)
+
+    assert path.startswith(str(temp_dir)) and path.endswith(".csv")
+    with open(path, "rb") as file:
+        assert file.read() == CSV
+
+
+def test_download_decodes_gzip_transfer_encoding(server, temp_dir):
+    path = download_csv(f"{server}/gzip.csv")
+
+    with open(path, "rb") as file:
+        assert file.read() == CSV
+
+
+def test_download_keeps_gz_files_compressed(server, temp_dir):
+    path = download_csv(f"{server}/data.csv.gz")
+
+    assert path.endswith(".csv.gz")
+    with gzip.open(path, "rb") as file:
+        assert file.read() == CSV
+
+
+def test_http_error_removes_the_temp_file(server, temp_dir):
+    with pytest.raises(requests.HTTPError):
+        download_csv(f"{server}/missing.csv")
+
+    assert list(temp_dir.iterdir()) == []
+
+
+def test_interrupted_download_removes_the_temp_file(server, temp_dir):
+    with pytest.raises(requests.RequestException):
+        download_csv(f"{server}/truncated.csv", chunk_size=4096)
+
+    assert list(temp_dir.iterdir()) == []
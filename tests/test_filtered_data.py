@@ -0,0 +1,87 @@
+import json
+import pytest
+from pymongo import errors
+from app import create_app
+from app.etl.components import mongodb
+from config import Config
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class SqliteConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    TESTING = True
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    db = mongomock.MongoClient()["api_db"]
+    monkeypatch.setattr(mongodb, "get_db", lambda: db)
+    return db
+
+
+@pytest.fixture
+def client():
+    return create_app(SqliteConfig).test_client()
+
+
+def all_pages(client, page_size):
+    documents, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/data/", query_string={"cursor": cursor, "page_size": page_size})
+        assert response.status_code == 200, response.json
+        documents += response.json["data"]
+        cursor = response.json["next_cursor"]
+    return documents
+
+
+def test_cursor_pages_go_past_null_keys(client, mongo_db):
+    mongo_db["TESTURLE"].insert_many([
+        {"date": None, "country": "FR"},
+        {"country": "DE"},
+        {"date": None, "country": None},
+        {"date": "2021-01-01", "country": None},
+        {"date": "2021-01-01", "country": "FR"},
+        {"date": "2021-01-02", "country": "FR"},
+    ])
+
+    documents = all_pages(client, page_size=1)
+
+    assert len(documents) == 6
+    assert len({document["_id"] for document in documents}) == 6
+
+
+def test_cursor_page_size_must_be_positive(client, mongo_db):
+    response = client.get("/api/data/", query_string={"cursor": "", "page_size": 0})
+    assert response.status_code == 400
+
+
+def test_cursor_page_fails_when_mongo_fails(client, monkeypatch):
+    def get_db():
+        raise errors.ServerSelectionTimeoutError("no servers")
+    monkeypatch.setattr(mongodb, "get_db", get_db)
+
+    response = client.get("/api/data/", query_string={"cursor": ""})
+    assert response.status_code == 500
+
+
+def test_streamed_cursor_pages_send_the_next_cursor_in_a_header(client, mongo_db):
+    mongo_db["TESTURLE"].insert_many([{"date": f"2021-01-0{day}", "country": "FR"} for day in range(1, 6)])
+    buffered = all_pages(client, page_size=2)
+
+    streamed, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/data/", query_string={"cursor": cursor, "page_size": 2},
+                              headers={"Accept": "application/x-ndjson"})
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        streamed += [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert streamed == buffered
+
+
+def test_streamed_cursor_page_rejects_a_malformed_cursor(client, mongo_db):
+    response = client.get("/api/data/", query_string={"cursor": "not-a-cursor", "stream": "true"})
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+from app import create_app
+from app.db import db
+from app.repositories.pagination import encode_cursor
+from config import Config
+
+
+class SqliteConfig(Config):
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    TESTING = True
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    SqliteConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('db') / 'api.db'}"
+    app = create_app(SqliteConfig)
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+
+
+@pytest.mark.parametrize("url, values", [
+    ("/api/rapport/", ["1"]),
+    ("/api/rapport/", [True]),
+    ("/api/rapport/", [1.5]),
+    ("/api/concerne/", ["EU", "FR", "IDF", "1"]),
+    ("/api/concerne/", [1, "FR", "IDF", 1]),
+])
+def test_cursor_values_of_the_wrong_type_are_rejected(client, url, values):
+    response = client.get(url, query_string={"cursor": encode_cursor(values)})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("url, values", [
+    ("/api/rapport/", [1]),
+    ("/api/concerne/", ["EU", "FR", "IDF", 1]),
+])
+def test_cursor_values_of_the_key_types_are_accepted(client, url, values):
+    response = client.get(url, query_string={"cursor": encode_cursor(values)})
+    assert response.status_code == 200
@@ -0,0 +1,110 @@
+import os
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import text
+from app import create_app
+from app.db import db
+from app.repositories.pays_repo import PaysRepository
+from app.repositories.rapport_repo import RapportRepository
+from app.repositories.region_repo import RegionRepository
+from config import Config
+import check_query_plans
+
+# EXPLAIN needs Postgres: point TEST_DATABASE_URL to an empty database, its tables are truncated and seeded
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+THRESHOLD = check_query_plans.DEFAULT_ROW_THRESHOLD
+PAGE_SIZE = 10
+REGION_INDEX = "ix_region_code_pays"
+
+# About the shape of the real data: some 250 countries with a few dozen regions each,
+# a few years of daily rapports for a handful of diseases
+SEED = """
+TRUNCATE concerne, rapport, region, pays, continent, maladie, periode RESTART IDENTITY CASCADE;
+INSERT INTO continent (code_continent, nom) SELECT 'C' || i, 'Continent ' || i FROM generate_series(1, 6) i;
+INSERT INTO pays (code_pays, nom, code_continent) SELECT 'P' || i, 'Pays ' || i, 'C' || (i % 6 + 1) FROM generate_series(1, 250) i;
+INSERT INTO region (code_region, nom, code_pays) SELECT 'R' || i, 'Region ' || i, 'P' || (i % 250 + 1) FROM generate_series(1, 12000) i;
+INSERT INTO maladie (nom) SELECT 'Maladie ' || i FROM generate_series(1, 10) i;
+INSERT INTO periode (nom) SELECT 'Periode ' || i FROM generate_series(1, 10) i;
+INSERT INTO rapport (date_debut, date_fin, code_maladie, code_periode, nouveaux_cas)
+    SELECT date '2020-01-01' + i % 1500, date '2020-01-02' + i % 1500, i % 10 + 1, i % 10 + 1, i % 100 FROM generate_series(1, 150000) i;
+INSERT INTO concerne (code_continent, code_pays, code_region, code_rapport)
+    SELECT 'C' || (i % 250 % 6 + 1), 'P' || (i % 250 + 1), 'R' || (i % 12000 + 1), i FROM generate_series(1, 150000) i;
+"""
+
+
+class PostgresConfig(Config):
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
+    TESTING = True
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = create_app(PostgresConfig)
+    with app.app_context():
+        upgrade(directory="migrations")
+        with db.engine.begin() as connection:
+            connection.execute(text(SEED))
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql(f"ANALYZE {', '.join(check_query_plans.TABLES)}")
+        yield app
+        db.session.remove()
+
+
+def plans(call):
+    """Plan nodes of every SELECT sent while call() runs"""
+    with db.engine.connect() as connection:
+        statements = check_query_plans.capture_selects(db.engine, call)
+        result = [check_query_plans.explain(connection, statement, parameters) for statement, parameters in statements]
+    db.session.rollback()
+    return result
+
+
+def index_names(node):
+    """Indexes read by a scan node (a Bitmap Heap Scan reads those of its Bitmap Index Scans)"""
+    if node["Node Type"] == "Bitmap Heap Scan":
+        return {child["Index Name"] for child in check_query_plans.plan_nodes(node) if "Index Name" in child}
+    return {node["Index Name"]} if "Index Name" in node else set()
+
+
+def test_no_sequential_scan_on_large_tables(app):
+    session = db.session
+    with db.engine.connect() as connection:
+        table_rows = dict(connection.exec_driver_sql(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'p')"
+        ).all())
+        failures = []
+        for name, call in check_query_plans.repository_queries(session, check_query_plans.sample_values(session)):
+            for statement, parameters in check_query_plans.capture_selects(db.engine, call):
+                scans = check_query_plans.seq_scans(connection, statement, parameters, table_rows, THRESHOLD)
+                failures += [f"{name}: Seq Scan on {table} (~{rows:.0f} rows)" for table, rows in scans]
+            session.rollback()
+    assert not failures
+
+
+@pytest.mark.parametrize("name, call", [
+    ("pays.get_page(expand)", lambda session: PaysRepository(session).get_page(limit=PAGE_SIZE, expand=["continent", "regions"])),
+    ("pays.get_by_code(expand)", lambda session: PaysRepository(session).get_by_code("P1", expand=["regions"])),
+    ("region.get_by_pays", lambda session: RegionRepository(session).get_by_pays("P1")),
+    ("region.get_page(code_pays)", lambda session: RegionRepository(session).get_page(limit=PAGE_SIZE, code_pays="P1")),
+])
+def test_regions_of_countries_are_read_through_the_code_pays_index(app, name, call):
+    region_scans = [node for plan in plans(lambda: call(db.session)) for node in plan
+                    if node.get("Relation Name") == "region"]
+    assert region_scans, f"{name} does not read region"
+    assert all(index_names(node) == {REGION_INDEX} for node in region_scans), \
+        f"{name}: " + ", ".join(f"{node['Node Type']} {sorted(index_names(node))}" for node in region_scans)
+
+
+
+def test_aggregate_by_pays_reads_concerne_through_the_rapports_of_the_period(app):
+    period = check_query_plans.sample_values(db.session)
+    call = lambda: RapportRepository(db.session).aggregate(group_by=["pays"], date_debut_min=period["date_debut_min"],
+                                                           date_debut_max=period["date_debut_max"])
+    concerne_scans = [node for plan in plans(call) for node in plan if node.get("Relation Name") == "concerne"]
+    assert concerne_scans
+    # Looked up per rapport, not a DISTINCT over the whole table read through the index
+    assert all(index_names(node) == {"ix_concerne_code_rapport"} and node["Plan Rows"] < THRESHOLD
+               for node in concerne_scans), \
+        ", ".join(f"{node['Node Type']} {sorted(index_names(node))} ~{node['Plan Rows']} rows" for node in concerne_scans)
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+from app.etl.components import transform
+from app.etl.components.transform import SchemaMismatch, transform_data
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    transform._schema_cache.clear()
+    yield
+    transform._schema_cache.clear()
+
+
+def test_numbers_stay_numbers_and_missing_values_are_filled():
+    data = transform_data(pd.DataFrame({"New Cases": ["1", "2", None], "Country": ["FR", "FR", "DE"]}), source="a.csv")
+    assert data["new_cases"].tolist() == [1, 2, 0]
+
+
+def test_text_in_a_later_chunk_fails_before_any_chunk_is_transformed():
+    chunks = [pd.DataFrame({"cases": ["1", "2"]}), pd.DataFrame({"cases": ["3", "n/a"]})]
+    with pytest.raises(SchemaMismatch, match="n/a"):
+        transform.transform_file(lambda: iter(chunks), source="a.csv")
+    assert not transform._schema_cache
+
+
+def test_schema_is_inferred_again_when_a_new_ingest_does_not_fit_it():
+    transform_data(pd.DataFrame({"cases": ["1", "2"]}), source="a.csv")
+    data = transform_data(pd.DataFrame({"cases": ["3", "n/a"]}), source="a.csv")
+    assert data["cases"].tolist() == ["3", "n/a"]
+
+
+def test_schema_is_cached_per_source_and_header():
+    transform_data(pd.DataFrame({"value": ["1", "2"]}), source="a.csv")
+    # Same source, other header; other source, same header: each infers its own schema
+    transform_data(pd.DataFrame({"value": ["x", "y"], "extra": ["1", "2"]}), source="a.csv")
+    transform_data(pd.DataFrame({"value": ["x", "y"]}), source="b.csv")
+    assert len(transform._schema_cache) == 3
+
+
+def test_date_format_fits_every_sampled_value():
+    data = transform_data(pd.DataFrame({"date": ["05/01/2020", "13/01/2020"]}), source="a.csv")
+    assert data["date"].tolist() == ["2020-01-05 00:00:00", "2020-01-13 00:00:00"]
+
+
+def test_dates_in_several_formats_are_kept_as_text():
+    data = transform_data(pd.DataFrame({"date": ["2020-01-05", "Jan 6 2020"]}), source="a.csv")
+    assert data["date"].tolist() == ["2020-01-05", "Jan 6 2020"]
+
+
+def test_date_not_matching_the_format_of_the_file_fails():
+    chunks = [pd.DataFrame({"date": ["2020-01-05", "2020-01-06"]}), pd.DataFrame({"date": ["2020-01-07", "08/01/2020"]})]
+    with pytest.raises(SchemaMismatch, match="date"):
+        transform.transform_file(lambda: iter(chunks), source="a.csv")
+
+
+def test_chunks_give_the_same_documents_as_the_whole_file(tmp_path):
+    # new_tests and units only have values in the last rows, empty is empty everywhere
+    rows = ["date,country,new_tests,units,empty"]
+    rows += [f"2021-01-{day:02d},C{day % 3},,," for day in range(1, 21)]
+    rows += ["2021-01-21,C0,12,tests performed,", "2021-01-22,C1,,people tested,"]
+    path = tmp_path / "data.csv"
+    path.write_text("\n".join(rows) + "\n")
+
+    whole = transform_data(pd.read_csv(path)).to_dict("records")
+    transform._schema_cache.clear()
+    chunked = [record for chunk in transform.transform_file(lambda: pd.read_csv(path, chunksize=5), source=str(path))
+               for record in chunk.to_dict("records")]
+
+    assert chunked == whole
+    assert whole[0] == {"date": "2021-01-01 00:00:00", "country": "C1", "new_tests": 0.0, "units": ""}
+
+
+def test_ingest_inserts_nothing_when_a_later_chunk_does_not_fit(tmp_path, monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    from app.etl.components import mongodb
+    from app.routes import etl_service
+
+    db = mongomock.MongoClient()["api_db"]
+    monkeypatch.setattr(mongodb, "get_db", lambda: db)
+    monkeypatch.setattr(etl_service.Config, "ETL_CHUNK_SIZE", 2)
+    path = tmp_path / "upload.csv"
+    path.write_text("country,cases\nFR,1\nDE,2\nIT,3\nES,unknown\n")
+
+    class Job:
+        def progress(self, rows):
+            pass
+
+    with pytest.raises(SchemaMismatch):
+        etl_service.ingest_file(Job(), str(path), "cases", source="upload.csv")
+    assert db["cases"].count_documents({}) == 0
+    assert not path.exists()
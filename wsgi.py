@@ -0,0 +1,5 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app"""
+from app import create_app
+from config import ProductionConfig
+
+app = create_app(ProductionConfig)